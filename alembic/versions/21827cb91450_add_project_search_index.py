@@ -0,0 +1,67 @@
+"""add project search index
+
+Revision ID: 21827cb91450
+Revises: 4e244e19a1da
+Create Date: 2026-10-18 14:10:28.947506
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '21827cb91450'
+down_revision: Union[str, None] = '4e244e19a1da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблица FTS5 с внешним содержимым и триггеры, синхронизирующие ее
+# с charityproject (SQLite).
+SEARCH_INDEX_DDL = (
+    'CREATE VIRTUAL TABLE charityproject_fts USING fts5('
+    "name, description, content='charityproject', content_rowid='id')",
+    'CREATE TRIGGER charityproject_fts_insert AFTER INSERT ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts (rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); '
+    'END',
+    'CREATE TRIGGER charityproject_fts_delete AFTER DELETE ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts '
+    '(charityproject_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'END',
+    'CREATE TRIGGER charityproject_fts_update '
+    'AFTER UPDATE OF name, description ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts '
+    '(charityproject_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO charityproject_fts (rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); '
+    'END',
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'CREATE INDEX ix_charityproject_search ON charityproject '
+            "USING gin (to_tsvector('simple', name || ' ' || description))"
+        )
+        return
+    for statement in SEARCH_INDEX_DDL:
+        op.execute(statement)
+    op.execute(
+        "INSERT INTO charityproject_fts (charityproject_fts) VALUES ('rebuild')"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX ix_charityproject_search')
+        return
+    for trigger in ('insert', 'delete', 'update'):
+        op.execute(f'DROP TRIGGER charityproject_fts_{trigger}')
+    op.execute('DROP TABLE charityproject_fts')
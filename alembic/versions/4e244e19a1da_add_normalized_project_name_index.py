@@ -0,0 +1,33 @@
+"""add normalized project name index
+
+Revision ID: 4e244e19a1da
+Revises: c5ece7f56a8e
+Create Date: 2026-10-18 14:05:45.416067
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e244e19a1da'
+down_revision: Union[str, None] = 'c5ece7f56a8e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_charityproject_name_normalized',
+        'charityproject',
+        [sa.text('lower(trim(name))')],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_charityproject_name_normalized', table_name='charityproject'
+    )
@@ -0,0 +1,74 @@
+"""normalize project names in python
+
+Revision ID: 5b8e1f3c2d47
+Revises: c1043bcaada1
+Create Date: 2026-10-18 15:10:12.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f3c2d47'
+down_revision: Union[str, None] = 'c1043bcaada1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+charityproject = sa.table(
+    'charityproject',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('name_normalized', sa.Text),
+)
+
+
+def upgrade() -> None:
+    op.drop_index(
+        'ix_charityproject_name_normalized', table_name='charityproject'
+    )
+    op.add_column(
+        'charityproject', sa.Column('name_normalized', sa.Text(), nullable=True)
+    )
+    # lower() в SQLite меняет только латиницу, поэтому названия
+    # нормализуются в Python, как и в приложении.
+    connection = op.get_bind()
+    projects = connection.execute(
+        sa.select(charityproject.c.id, charityproject.c.name)
+    ).all()
+    for project_id, name in projects:
+        connection.execute(
+            charityproject.update()
+            .where(charityproject.c.id == project_id)
+            .values(name_normalized=name.strip().casefold())
+        )
+    # В SQLite NOT NULL можно добавить только пересозданием таблицы, а с
+    # ней пропали бы триггеры полнотекстового индекса; значение колонки
+    # там заполняет приложение.
+    if connection.dialect.name != 'sqlite':
+        op.alter_column(
+            'charityproject', 'name_normalized',
+            existing_type=sa.Text(), nullable=False
+        )
+    op.create_index(
+        'ix_charityproject_name_normalized',
+        'charityproject',
+        ['name_normalized'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_charityproject_name_normalized', table_name='charityproject'
+    )
+    op.drop_column('charityproject', 'name_normalized')
+    op.create_index(
+        'ix_charityproject_name_normalized',
+        'charityproject',
+        [sa.text('lower(trim(name))')],
+        unique=True
+    )
@@ -2,3 +2,4 @@ from .charity_project import router as charity_project_router  # noqa
 from .user import router as user_router  # noqa
 from .donation import router as donation_router  # noqa
 from .google_api import router as google_api_router  # noqa
+from .stats import router as stats_router  # noqa
@@ -1,19 +1,38 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from pydantic import PositiveInt, TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.charity_project import (CharityProjectDB,
                                          CharityProjectCreate,
+                                         CharityProjectSimulation,
+                                         CharityProjectSimulationCreate,
                                          CharityProjectUpdate)
-from app.core.db import get_async_session
+from app.schemas.investment import InvestmentDB
+from app.core.cache import charity_project_cache
+from app.core.db import get_async_session, get_unit_of_work
 from app.crud.charity_project import charity_project_crud
-from app.api.validators import (check_name_duplicate,
+from app.crud.donation import donation_crud
+from app.crud.investment import investment_crud
+from app.api.fields import SparseFields, dump_sparse
+from app.api.filters import list_filters
+from app.api.pagination import Page, Pagination, ranked_page
+from app.api.validators import (check_charityproject_exists,
+                                check_name_duplicate,
                                 check_project_before_delete,
                                 check_project_before_edit)
 from app.core.user import current_superuser
+from app.services.export import NDJSON_MEDIA_TYPE, export_ndjson
+from app.services.investment_scheduler import commit_and_wait
+from app.services.simulation import forecast_projects
 
 router = APIRouter(prefix='/charity_project', tags=['charity_project'])
 
+projects_adapter = TypeAdapter(list[CharityProjectDB])
+
 
 @router.get(
     '/',
@@ -21,13 +40,95 @@ router = APIRouter(prefix='/charity_project', tags=['charity_project'])
     response_model_exclude_none=True
 )
 async def get_all_charity_projects(
+    request: Request,
+    response: Response,
+    page: Page = Depends(Pagination(charity_project_crud)),
+    fully_invested: bool | None = None,
+    create_date_from: datetime | None = None,
+    create_date_to: datetime | None = None,
+    close_date_from: datetime | None = None,
+    close_date_to: datetime | None = None,
+    full_amount_min: PositiveInt | None = None,
+    full_amount_max: PositiveInt | None = None,
+    fields: tuple[str, ...] | None = Depends(SparseFields(CharityProjectDB)),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Получает список всех проектов.
+    Получает список проектов постранично.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Список можно отфильтровать и отсортировать, а параметр fields
+    ограничивает набор полей в ответе.
+
+    Ответы кэшируются и снабжаются ETag: на запрос с совпадающим
+    If-None-Match возвращается 304.
     """
-    projects = await charity_project_crud.get_multi(session)
-    return projects
+    cached = charity_project_cache.get_response(request)
+    if cached is None:
+        generation = charity_project_cache.generation
+        projects = await charity_project_crud.get_multi(
+            session, page.fetch_limit, page.after, fields=fields,
+            sort=page.sort, filters=list_filters(
+                fully_invested, create_date_from, create_date_to,
+                close_date_from, close_date_to, full_amount_min,
+                full_amount_max
+            )
+        )
+        projects = page.paginate(projects, response)
+        if fields is None:
+            body = projects_adapter.dump_json(
+                projects_adapter.validate_python(projects),
+                exclude_none=True
+            )
+        else:
+            body = dump_sparse(projects, fields)
+        cached = charity_project_cache.set_response(
+            request, body, dict(response.headers), generation
+        )
+    return cached.response(request)
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_superuser)]
+)
+async def export_charity_projects(
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Только для суперюзеров.
+
+    Выгружает все проекты потоком в формате NDJSON: по одному проекту на
+    строку.
+    """
+    return StreamingResponse(
+        export_ndjson(charity_project_crud, CharityProjectDB, session),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get(
+    '/search',
+    response_model=list[CharityProjectDB],
+    response_model_exclude_none=True
+)
+async def search_charity_projects(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: Page = Depends(ranked_page),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Ищет проекты по словам из названия и описания.
+
+    Результаты упорядочены по релевантности; курсор следующей страницы
+    возвращается в заголовке X-Next-Cursor.
+    """
+    projects = await charity_project_crud.search(
+        session, q, page.fetch_limit, page.after
+    )
+    return page.paginate(projects, response)
 
 
 @router.post(
@@ -38,18 +139,44 @@ async def get_all_charity_projects(
 )
 async def create_charity_project(
     project: CharityProjectCreate,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_unit_of_work)
 ):
     """
     Только для суперюзеров.
 
     Создает благотворительный проект.
     """
-    await check_name_duplicate(project.name, session)
-    new_project = await charity_project_crud.create(project, session)
+    with check_name_duplicate():
+        new_project = await charity_project_crud.create(project, session)
+        await commit_and_wait(session)
     return new_project
 
 
+@router.post(
+    '/simulate',
+    response_model=CharityProjectSimulation,
+    dependencies=[Depends(current_superuser)]
+)
+async def simulate_charity_projects(
+    simulation: CharityProjectSimulationCreate,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Только для суперюзеров.
+
+    Прогнозирует, какие проекты закроются при поступлении ожидаемых
+    пожертвований и каким из них. Ничего не записывает в базу данных.
+    """
+    projects = await charity_project_crud.get_open_projects(session)
+    open_donation_amounts = (
+        await donation_crud.get_open_remaining_amounts(session)
+    )
+    forecast, idle_amount = forecast_projects(
+        projects, open_donation_amounts, simulation.donations
+    )
+    return {'projects': forecast, 'idle_amount': idle_amount}
+
+
 @router.delete(
     '/{project_id}',
     response_model=CharityProjectDB,
@@ -57,7 +184,7 @@ async def create_charity_project(
 )
 async def delete_charity_project(
     project_id: int,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_unit_of_work)
 ):
     """
     Только для суперюзеров.
@@ -78,7 +205,7 @@ async def delete_charity_project(
 async def update_charity_project(
     project_id: int,
     project_in: CharityProjectUpdate,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_unit_of_work)
 ):
     """
     Только для суперюзеров.
@@ -90,9 +217,28 @@ async def update_charity_project(
     project = await check_project_before_edit(
         project_id, project_in.full_amount, session
     )
-    if project_in.name is not None:
-        await check_name_duplicate(project_in.name, session)
-    updated_project = await charity_project_crud.update(
-        project, project_in, session
-    )
+    with check_name_duplicate():
+        updated_project = await charity_project_crud.update(
+            project, project_in, session
+        )
+        await commit_and_wait(session)
     return updated_project
+
+
+@router.get(
+    '/{project_id}/donations',
+    response_model=list[InvestmentDB],
+    dependencies=[Depends(current_superuser)]
+)
+async def get_charity_project_donations(
+    project_id: int,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Только для суперюзеров.
+
+    Получает пожертвования, вложенные в проект, из журнала распределения.
+    """
+    await check_charityproject_exists(project_id, session)
+    investments = await investment_crud.get_by_project(project_id, session)
+    return investments
@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
 
+from fastapi import APIRouter, Body, Depends, Response
+from fastapi.responses import StreamingResponse
+
+from pydantic import PositiveInt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.donation import DonationDB, DonationCreate, DonationDBShort
+from app.api.fields import SparseFields, sparse_response
+from app.api.filters import list_filters
+from app.api.pagination import Page, Pagination
+from app.api.validators import check_donation_exists
+from app.schemas.donation import (DonationBulkResult, DonationDB,
+                                  DonationCreate, DonationDBShort,
+                                  DonationSummaryDB)
+from app.schemas.investment import InvestmentDB
 from app.core.user import current_superuser, current_user
-from app.core.db import get_async_session
+from app.core.db import get_async_session, get_unit_of_work
 from app.crud.donation import donation_crud
+from app.crud.donation_summary import donation_summary_crud
+from app.crud.investment import investment_crud
 from app.models import User
+from app.services.export import NDJSON_MEDIA_TYPE, export_ndjson
+from app.services.investment_scheduler import commit_and_wait
 
 router = APIRouter(prefix='/donation', tags=['donations'])
 
@@ -18,17 +33,62 @@ router = APIRouter(prefix='/donation', tags=['donations'])
     dependencies=[Depends(current_superuser)]
 )
 async def get_all_donations(
+        response: Response,
+        page: Page = Depends(Pagination(donation_crud)),
+        fully_invested: bool | None = None,
+        create_date_from: datetime | None = None,
+        create_date_to: datetime | None = None,
+        close_date_from: datetime | None = None,
+        close_date_to: datetime | None = None,
+        full_amount_min: PositiveInt | None = None,
+        full_amount_max: PositiveInt | None = None,
+        user_id: int | None = None,
+        fields: tuple[str, ...] | None = Depends(SparseFields(DonationDB)),
         session: AsyncSession = Depends(get_async_session)
 ):
     """
     Только для суперюзеров.
 
-    Получает все пожертвования.
+    Получает пожертвования постранично.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Список можно отфильтровать (в том числе по пользователю) и
+    отсортировать, а параметр fields ограничивает набор полей в ответе.
     """
-    donations = await donation_crud.get_multi(session)
+    donations = await donation_crud.get_multi(
+        session, page.fetch_limit, page.after, fields=fields, sort=page.sort,
+        filters=list_filters(
+            fully_invested, create_date_from, create_date_to,
+            close_date_from, close_date_to, full_amount_min, full_amount_max,
+            user_id=user_id
+        )
+    )
+    donations = page.paginate(donations, response)
+    if fields is not None:
+        return sparse_response(donations, fields, response)
     return donations
 
 
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_superuser)]
+)
+async def export_donations(
+        session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Только для суперюзеров.
+
+    Выгружает все пожертвования потоком в формате NDJSON: по одному
+    пожертвованию на строку.
+    """
+    return StreamingResponse(
+        export_ndjson(donation_crud, DonationDB, session),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
 @router.post(
     '/',
     response_model=DonationDBShort,
@@ -36,7 +96,7 @@ async def get_all_donations(
 )
 async def create_donation(
     donation: DonationCreate,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_unit_of_work),
     user: User = Depends(current_user)
 ):
     """
@@ -46,17 +106,97 @@ async def create_donation(
     return new_donation
 
 
+@router.post(
+    '/bulk',
+    response_model=list[DonationBulkResult]
+)
+async def create_donations_bulk(
+    donations: list[DonationCreate] = Body(..., min_length=1),
+    session: AsyncSession = Depends(get_unit_of_work),
+    user: User = Depends(current_user)
+):
+    """
+    Создает пачку пожертвований одним запросом.
+
+    Распределение по проектам выполняется один раз для всей пачки. В ответе
+    для каждого пожертвования возвращаются его идентификатор и итог
+    распределения.
+    """
+    new_donations = await donation_crud.create_many(donations, session, user)
+    await commit_and_wait(session)
+    return new_donations
+
+
 @router.get(
     '/my',
     response_model=list[DonationDBShort],
     response_model_exclude_none=True
 )
 async def get_user_donations(
+    response: Response,
+    page: Page = Depends(Pagination(donation_crud)),
+    fully_invested: bool | None = None,
+    create_date_from: datetime | None = None,
+    create_date_to: datetime | None = None,
+    close_date_from: datetime | None = None,
+    close_date_to: datetime | None = None,
+    full_amount_min: PositiveInt | None = None,
+    full_amount_max: PositiveInt | None = None,
+    fields: tuple[str, ...] | None = Depends(SparseFields(DonationDBShort)),
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user)
 ):
     """
-    Получает все пожертвования текущего пользователя.
+    Получает пожертвования текущего пользователя постранично.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Список можно отфильтровать и отсортировать, а параметр fields
+    ограничивает набор полей в ответе.
     """
-    donations = await donation_crud.get_by_user(session, user)
+    donations = await donation_crud.get_by_user(
+        session, user, limit=page.fetch_limit, after=page.after,
+        fields=fields, sort=page.sort, filters=list_filters(
+            fully_invested, create_date_from, create_date_to,
+            close_date_from, close_date_to, full_amount_min, full_amount_max
+        )
+    )
+    donations = page.paginate(donations, response)
+    if fields is not None:
+        return sparse_response(donations, fields, response)
     return donations
+
+
+@router.get(
+    '/my/summary',
+    response_model=DonationSummaryDB
+)
+async def get_user_donations_summary(
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user)
+):
+    """
+    Получает итоги пожертвований текущего пользователя: число
+    пожертвований, их общую сумму и сумму, распределенную по проектам.
+    """
+    summary = await donation_summary_crud.get_by_user(session, user)
+    return summary
+
+
+@router.get(
+    '/{donation_id}/projects',
+    response_model=list[InvestmentDB],
+    dependencies=[Depends(current_superuser)]
+)
+async def get_donation_projects(
+    donation_id: int,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Только для суперюзеров.
+
+    Получает проекты, в которые вложено пожертвование, из журнала
+    распределения.
+    """
+    await check_donation_exists(donation_id, session)
+    investments = await investment_crud.get_by_donation(donation_id, session)
+    return investments
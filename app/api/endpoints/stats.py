@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.core.password import password_pool
+from app.core.user import current_superuser, user_cache
+from app.crud.stats import stats_crud
+from app.schemas.stats import CacheStats, PasswordPoolStats, StatsDB
+
+router = APIRouter(prefix='/stats', tags=['stats'])
+
+
+@router.get(
+    '/',
+    response_model=StatsDB
+)
+async def get_stats(
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Получает общую статистику фонда: собранную и распределенную суммы,
+    число открытых и закрытых проектов и число жертвователей.
+    """
+    stats = await stats_crud.get_stats(session)
+    return stats
+
+
+@router.get(
+    '/cache',
+    response_model=dict[str, CacheStats],
+    dependencies=[Depends(current_superuser)]
+)
+async def get_cache_stats():
+    """
+    Только для суперюзеров.
+
+    Получает счетчики попаданий и промахов кэшей процесса приложения.
+    """
+    return {'users': user_cache.stats()}
+
+
+@router.get(
+    '/password_pool',
+    response_model=PasswordPoolStats,
+    dependencies=[Depends(current_superuser)]
+)
+async def get_password_pool_stats():
+    """
+    Только для суперюзеров.
+
+    Получает счетчики пула хеширования паролей процесса приложения:
+    число потоков, расчеты в работе и длину очереди.
+    """
+    return password_pool.stats()
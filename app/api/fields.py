@@ -0,0 +1,98 @@
+from typing import Any
+
+from fastapi import Query, Response
+from fastapi.exceptions import HTTPException
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+
+rows_adapter = TypeAdapter(list[dict[str, Any]])
+
+
+class SparseFields:
+    """
+    Зависимость для параметра fields: списка полей, которые нужно вернуть.
+
+    Attributes:
+        allowed (tuple[str, ...]): Поля схемы ответа, которые можно запросить.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.allowed = tuple(schema.model_fields)
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            None, description='Поля ответа через запятую, например id,name'
+        ),
+    ) -> tuple[str, ...] | None:
+        """
+        Разбирает параметр fields.
+
+        Args:
+            fields (str or None): Поля через запятую.
+
+        Returns:
+            tuple[str, ...] or None: Запрошенные поля или None, если нужны
+                                     все поля схемы.
+
+        Raises:
+            HTTPException: Если запрошены поля, которых нет в схеме ответа.
+        """
+        if fields is None:
+            return None
+        requested = tuple(dict.fromkeys(
+            field.strip() for field in fields.split(',') if field.strip()
+        ))
+        unknown = [field for field in requested if field not in self.allowed]
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=400,
+                detail='Недопустимые поля: ' + ', '.join(unknown or [fields])
+            )
+        return requested
+
+
+def dump_sparse(rows: list[Row], fields: tuple[str, ...]) -> bytes:
+    """
+    Сериализует строки с выбранными полями в JSON без схем ответа.
+
+    Как и у остальных списков, поля со значением None не выводятся.
+
+    Args:
+        rows (list[Row]): Строки с колонками fields.
+        fields (tuple[str, ...]): Поля ответа.
+
+    Returns:
+        bytes: JSON-массив объектов.
+    """
+    return rows_adapter.dump_json([
+        {
+            field: value for field in fields
+            if (value := getattr(row, field)) is not None
+        }
+        for row in rows
+    ])
+
+
+def sparse_response(
+    rows: list[Row],
+    fields: tuple[str, ...],
+    response: Response,
+) -> Response:
+    """
+    Строит JSON-ответ из строк с выбранными полями (см. dump_sparse).
+
+    Args:
+        rows (list[Row]): Строки с колонками fields.
+        fields (tuple[str, ...]): Поля ответа.
+        response (Response): Ответ эндпоинта с уже выставленными заголовками.
+
+    Returns:
+        Response: JSON-ответ.
+    """
+    return Response(
+        dump_sparse(rows, fields),
+        media_type='application/json',
+        headers=dict(response.headers)
+    )
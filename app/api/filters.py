@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any
+
+
+def list_filters(
+    fully_invested: bool | None = None,
+    create_date_from: datetime | None = None,
+    create_date_to: datetime | None = None,
+    close_date_from: datetime | None = None,
+    close_date_to: datetime | None = None,
+    full_amount_min: int | None = None,
+    full_amount_max: int | None = None,
+    **equal: Any,
+) -> dict[str, Any]:
+    """
+    Переводит параметры запроса списка в фильтры CRUDBase.get_multi.
+
+    Args:
+        fully_invested (bool or None): Закрыт ли объект.
+        create_date_from (datetime or None): Создан не раньше.
+        create_date_to (datetime or None): Создан не позже.
+        close_date_from (datetime or None): Закрыт не раньше.
+        close_date_to (datetime or None): Закрыт не позже.
+        full_amount_min (int or None): Сумма не меньше.
+        full_amount_max (int or None): Сумма не больше.
+        **equal: Прочие поля, проверяемые на равенство.
+
+    Returns:
+        dict[str, Any]: Фильтры в формате CRUDBase.filter_conditions.
+    """
+    return {
+        'fully_invested': fully_invested,
+        'create_date__gte': create_date_from,
+        'create_date__lte': create_date_to,
+        'close_date__gte': close_date_from,
+        'close_date__lte': close_date_to,
+        'full_amount__gte': full_amount_min,
+        'full_amount__lte': full_amount_max,
+        **equal,
+    }
@@ -0,0 +1,178 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any
+
+from fastapi import Query, Response
+from fastapi.exceptions import HTTPException
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(obj, sort_field: str) -> str:
+    """
+    Кодирует ключ (поле сортировки, id) объекта в непрозрачный курсор.
+
+    Args:
+        obj: Последний объект страницы.
+        sort_field (str): Поле сортировки.
+
+    Returns:
+        str: Курсор для запроса следующей страницы.
+    """
+    value = getattr(obj, sort_field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    key = f'{sort_field}|{value}|{obj.id}'
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_field: str, value_type: type) -> tuple:
+    """
+    Декодирует курсор в ключ (значение поля сортировки, id).
+
+    Args:
+        cursor (str): Курсор из заголовка X-Next-Cursor.
+        sort_field (str): Поле сортировки текущего запроса.
+        value_type (type): Тип значения поля сортировки.
+
+    Returns:
+        tuple: Ключ последнего объекта предыдущей страницы.
+
+    Raises:
+        HTTPException: Если курсор некорректен или выдан для другой
+                       сортировки.
+    """
+    parse = datetime.fromisoformat if value_type is datetime else value_type
+    try:
+        field, value, obj_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        )
+        if field != sort_field:
+            raise ValueError(field)
+        return parse(value), int(obj_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail='Некорректный курсор!'
+        )
+
+
+class Pagination:
+    """
+    Зависимость для постраничной выдачи списков по ключу
+    (поле сортировки, id).
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor;
+    если заголовка нет, страница последняя. Без limit и cursor список
+    возвращается целиком, как до появления постраничной выдачи; курсор без
+    limit выдает страницу размера settings.page_size.
+
+    Attributes:
+        crud (CRUDBase): CRUD-объект модели списка.
+    """
+
+    def __init__(self, crud: CRUDBase):
+        self.crud = crud
+
+    def __call__(
+        self,
+        limit: int | None = Query(None, ge=1, le=settings.max_page_size),
+        cursor: str | None = Query(None),
+        sort: str = Query(
+            'create_date',
+            description='Поле сортировки, "-" перед именем - по убыванию'
+        ),
+    ) -> 'Page':
+        """
+        Разбирает параметры постраничной выдачи.
+
+        Raises:
+            HTTPException: Если поле сортировки не разрешено или курсор
+                           некорректен.
+        """
+        sort_field = sort.removeprefix('-')
+        if sort_field not in self.crud.sort_fields:
+            raise HTTPException(
+                status_code=400,
+                detail='Сортировка возможна только по полям: ' + ', '.join(
+                    self.crud.sort_fields
+                )
+            )
+        after = None
+        if cursor is not None:
+            limit = limit or settings.page_size
+            value_type = getattr(
+                self.crud.model, sort_field
+            ).type.python_type
+            after = decode_cursor(cursor, sort_field, value_type)
+        return Page(limit, after, sort)
+
+
+def ranked_page(
+    limit: int = Query(settings.page_size, ge=1, le=settings.max_page_size),
+    cursor: str | None = Query(None),
+) -> 'Page':
+    """
+    Зависимость для постраничной выдачи результатов поиска по ключу
+    (rank, id).
+
+    Raises:
+        HTTPException: Если курсор некорректен.
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 'rank', float)
+    return Page(limit, after, 'rank')
+
+
+class Page:
+    """
+    Параметры запрошенной страницы.
+
+    Attributes:
+        limit (int or None): Размер страницы, None - весь список.
+        after (tuple or None): Ключ, после которого начинается страница.
+        sort (str): Поле сортировки, с "-" - по убыванию.
+    """
+
+    def __init__(
+        self,
+        limit: int | None,
+        after: tuple[Any, int] | None,
+        sort: str,
+    ):
+        self.limit = limit
+        self.after = after
+        self.sort = sort
+
+    @property
+    def fetch_limit(self) -> int | None:
+        """
+        Сколько объектов выбирать из базы: на один больше размера
+        страницы, чтобы узнать, есть ли следующая.
+        """
+        return None if self.limit is None else self.limit + 1
+
+    def paginate(self, objs: list, response: Response) -> list:
+        """
+        Обрезает выборку до размера страницы и выставляет курсор.
+
+        Args:
+            objs (list): Выборка размером не больше fetch_limit.
+            response (Response): Ответ, в который добавляется заголовок.
+
+        Returns:
+            list: Объекты страницы.
+        """
+        if self.limit is None or len(objs) <= self.limit:
+            return objs
+        objs = objs[:self.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            objs[-1], self.sort.removeprefix('-')
+        )
+        return objs
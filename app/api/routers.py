@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (charity_project_router, user_router,
-                               donation_router, google_api_router)
+                               donation_router, google_api_router,
+                               stats_router)
 
 
 main_router = APIRouter()
@@ -10,3 +11,4 @@ main_router.include_router(charity_project_router)
 main_router.include_router(donation_router)
 main_router.include_router(user_router)
 main_router.include_router(google_api_router)
+main_router.include_router(stats_router)
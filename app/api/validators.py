@@ -1,29 +1,77 @@
+from contextlib import contextmanager
+
 from fastapi.exceptions import HTTPException
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.charity_project import charity_project_crud
-from app.models import CharityProject
+from app.crud.donation import donation_crud
+from app.models import CharityProject, Donation
 
 
-async def check_name_duplicate(
-    project_name: str,
-    session: AsyncSession
-) -> None:
+# Ограничения уникальности названия проекта: уникальный индекс
+# нормализованного названия и ограничение UNIQUE колонки в PostgreSQL.
+NAME_UNIQUE_CONSTRAINTS = (
+    'ix_charityproject_name_normalized',
+    'charityproject_name_key',
+)
+# SQLite не сообщает имя ограничения, поэтому нарушение распознается по
+# тексту ошибки, в котором перечислены колонки индекса.
+SQLITE_NAME_UNIQUE_MARKERS = (
+    'charityproject.name_normalized',
+    'charityproject.name',
+)
+
+
+def violated_constraint(error: IntegrityError) -> str | None:
     """
-    Проверяет, существует ли проект с указанным именем.
+    Имя нарушенного ограничения из ошибки драйвера PostgreSQL.
+
+    psycopg сообщает его в diag.constraint_name, asyncpg - в атрибуте
+    constraint_name исходной ошибки, которую SQLAlchemy сохраняет в
+    __cause__.
 
     Args:
-        project_name (str): Имя проекта для проверки.
-        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        error (IntegrityError): Ошибка SQLAlchemy.
+
+    Returns:
+        str or None: Имя ограничения или None, если драйвер его не сообщает.
+    """
+    diag = getattr(error.orig, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name
+    return getattr(error.orig.__cause__, 'constraint_name', None)
+
+
+def is_name_duplicate(error: IntegrityError) -> bool:
+    """
+    Нарушает ли ошибка уникальность названия проекта.
+    """
+    constraint = violated_constraint(error)
+    if constraint is not None:
+        return constraint in NAME_UNIQUE_CONSTRAINTS
+    return any(
+        marker in str(error.orig) for marker in SQLITE_NAME_UNIQUE_MARKERS
+    )
+
+
+@contextmanager
+def check_name_duplicate():
+    """
+    Переводит нарушение уникальности названия проекта в ответ 400.
+
+    Уникальность проверяет сама база данных при вставке или обновлении,
+    поэтому отдельный запрос по названию не нужен.
 
     Raises:
         HTTPException: Если проект с таким именем уже существует.
     """
-    project_id = await charity_project_crud.get_project_id_by_name(
-        project_name, session
-    )
-    if project_id is not None:
+    try:
+        yield
+    except IntegrityError as error:
+        if not is_name_duplicate(error):
+            raise
         raise HTTPException(
             status_code=400,
             detail='Проект с таким именем уже существует!'
@@ -56,6 +104,32 @@ async def check_charityproject_exists(
     return project
 
 
+async def check_donation_exists(
+    donation_id: int,
+    session: AsyncSession
+) -> Donation:
+    """
+    Проверяет, существует ли пожертвование с указанным идентификатором.
+
+    Args:
+        donation_id (int): Идентификатор пожертвования для проверки.
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        Donation: Найденное пожертвование.
+
+    Raises:
+        HTTPException: Если пожертвование не найдено.
+    """
+    donation = await donation_crud.get(donation_id, session)
+    if donation is None:
+        raise HTTPException(
+            status_code=404,
+            detail='Пожертвование не найдено!'
+        )
+    return donation
+
+
 async def check_project_before_delete(
     project_id: int,
     session: AsyncSession
@@ -0,0 +1,204 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+class CachedResponse:
+    """
+    Сериализованный ответ из кэша.
+
+    Attributes:
+        body (bytes): Тело ответа в JSON.
+        headers (dict[str, str]): Дополнительные заголовки ответа.
+        etag (str): Сильный ETag тела ответа.
+    """
+    __slots__ = ('body', 'headers', 'etag')
+
+    def __init__(self, body: bytes, headers: dict[str, str]):
+        self.body = body
+        self.headers = headers
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def response(self, request: Request) -> Response:
+        """
+        Строит ответ на запрос.
+
+        Если заголовок If-None-Match запроса совпадает с ETag, возвращается
+        304 без тела.
+
+        Args:
+            request (Request): Запрос клиента.
+
+        Returns:
+            Response: Ответ 200 с телом или 304.
+        """
+        headers = {**self.headers, 'ETag': self.etag}
+        if_none_match = request.headers.get('if-none-match', '')
+        if self.etag in (tag.strip() for tag in if_none_match.split(',')):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            self.body, media_type='application/json', headers=headers
+        )
+
+
+class TTLCache:
+    """
+    Кэш значений по ключу в памяти процесса (LRU с TTL) со счетчиками
+    попаданий и промахов.
+
+    Записи сбрасываются при изменении данных (см. invalidate); в каждом
+    процессе приложения кэш свой, поэтому изменения, сделанные другими
+    процессами, становятся видны не позже чем через ttl секунд.
+
+    Attributes:
+        ttl (float): Время жизни записи в секундах, 0 отключает кэш.
+        max_size (int): Максимальное число записей.
+        generation (int): Номер поколения, увеличивается при каждом сбросе.
+        hits (int): Число попаданий.
+        misses (int): Число промахов.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any) -> Any | None:
+        """
+        Возвращает значение по ключу, если оно есть и не устарело.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Any, value: Any, generation: int) -> None:
+        """
+        Сохраняет значение по ключу.
+
+        Значение не сохраняется, если после его чтения из базы кэш был
+        сброшен: такие данные могли уже устареть.
+
+        Args:
+            key: Ключ.
+            value: Значение.
+            generation (int): Поколение кэша на момент чтения значения.
+        """
+        if self.ttl <= 0 or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Any = None) -> None:
+        """
+        Сбрасывает запись по ключу или, без ключа, все записи кэша.
+        """
+        self.generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def invalidate_on_commit(self, session: AsyncSession) -> None:
+        """
+        Сбрасывает кэш по завершении текущей транзакции сессии.
+
+        До коммита другие запросы еще видят старые данные, поэтому сброс
+        раньше коммита позволил бы им снова закэшировать устаревшее
+        значение.
+
+        Args:
+            session (AsyncSession): Сессия, изменившая данные.
+        """
+        session.info.setdefault('invalidate_caches', set()).add(self)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Счетчики кэша: попадания, промахи и текущее число записей.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+        }
+
+
+class ResponseCache(TTLCache):
+    """
+    Кэш сериализованных ответов (см. TTLCache).
+
+    Ключ - нормализованная строка запроса; при изменении данных кэш
+    сбрасывается целиком.
+    """
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """
+        Ключ кэша для запроса: параметры запроса в отсортированном виде.
+        """
+        return str(sorted(request.query_params.multi_items()))
+
+    def get_response(self, request: Request) -> CachedResponse | None:
+        """
+        Возвращает закэшированный ответ на запрос, если он не устарел.
+        """
+        return self.get(self.key(request))
+
+    def set_response(
+        self,
+        request: Request,
+        body: bytes,
+        headers: dict[str, str],
+        generation: int,
+    ) -> CachedResponse:
+        """
+        Сохраняет ответ на запрос.
+
+        Args:
+            request (Request): Запрос клиента.
+            body (bytes): Тело ответа.
+            headers (dict[str, str]): Дополнительные заголовки ответа.
+            generation (int): Поколение кэша на момент чтения данных.
+
+        Returns:
+            CachedResponse: Ответ для отправки клиенту.
+        """
+        entry = CachedResponse(body, headers)
+        self.set(self.key(request), entry, generation)
+        return entry
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def invalidate_caches(session: Session, transaction) -> None:
+    """
+    Сбрасывает кэши, отмеченные invalidate_on_commit, по завершении
+    транзакции.
+    """
+    if transaction.parent is None:
+        for cache in session.info.pop('invalidate_caches', ()):
+            cache.invalidate()
+
+
+charity_project_cache = ResponseCache(
+    ttl=settings.charity_project_cache_ttl,
+    max_size=settings.charity_project_cache_max_size,
+)
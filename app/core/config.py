@@ -1,4 +1,6 @@
-from pydantic import EmailStr
+from typing import Literal
+
+from pydantic import EmailStr, NonNegativeFloat, NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,6 +16,40 @@ class Settings(BaseSettings):
                                                             суперпользователя.
         first_superuser_password (str or None, default = None): Пароль первого
                                                             суперпользователя.
+        investment_engine (str, default = 'orm'): Движок распределения
+                            инвестиций: 'orm' - цикл по объектам в Python,
+                            'rows' - цикл по облегченным строкам без
+                            ORM-объектов, 'sql' - оконные функции в базе
+                            данных.
+        investment_scheduler_enabled (bool, default = False): Распределять
+                            инвестиции фоновым планировщиком, объединяя
+                            запросы в пачки.
+        investment_batch_window_ms (int, default = 5): Окно батчинга
+                            планировщика в миллисекундах.
+        investment_batch_max_size (int, default = 100): Число запросов,
+                            после которого проход запускается досрочно.
+        page_size (int, default = 100): Размер страницы поиска и страниц,
+                            запрошенных курсором без limit.
+        max_page_size (int, default = 1000): Максимальный размер страницы.
+        charity_project_cache_ttl (float, default = 30): Время жизни ответов
+                            списка проектов в кэше в секундах, 0 отключает
+                            кэш.
+        charity_project_cache_max_size (int, default = 256): Максимальное
+                            число ответов списка проектов в кэше.
+        user_cache_ttl (float, default = 0): Время жизни активного
+                            пользователя в кэше аутентификации в секундах,
+                            0 отключает кэш. Кэш сбрасывается только в
+                            процессе, изменившем пользователя: в остальных
+                            процессах деактивированный или лишенный прав
+                            суперпользователя пользователь сохраняет доступ
+                            до этого времени.
+                            Включайте кэш только для одного процесса или
+                            если такая задержка допустима.
+        user_cache_max_size (int, default = 10000): Максимальное число
+                            пользователей в кэше.
+        password_hash_workers (int, default = 2): Число потоков для
+                            хеширования и проверки паролей, 0 - считать
+                            в цикле событий.
         model_config (SettingsConfigDict): Конфигурация модели.
     """
     app_title: str
@@ -21,6 +57,17 @@ class Settings(BaseSettings):
     secret: str = 'secret'
     first_superuser_email: EmailStr | None = None
     first_superuser_password: str | None = None
+    investment_engine: Literal['orm', 'rows', 'sql'] = 'orm'
+    investment_scheduler_enabled: bool = False
+    investment_batch_window_ms: PositiveInt = 5
+    investment_batch_max_size: PositiveInt = 100
+    page_size: PositiveInt = 100
+    max_page_size: PositiveInt = 1000
+    charity_project_cache_ttl: NonNegativeFloat = 30
+    charity_project_cache_max_size: PositiveInt = 256
+    user_cache_ttl: NonNegativeFloat = 0
+    user_cache_max_size: PositiveInt = 10000
+    password_hash_workers: NonNegativeInt = 2
     type: str | None = None
     project_id: str | None = None
     private_key_id: str | None = None
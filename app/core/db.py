@@ -1,5 +1,7 @@
+from fastapi import Depends
 from sqlalchemy import Integer
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
 from sqlalchemy.orm import (DeclarativeBase, declared_attr, Mapped,
                             mapped_column)
 
@@ -25,7 +27,7 @@ class Base(DeclarativeBase):
 
 engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = async_sessionmaker(engine)
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def get_async_session():
@@ -37,3 +39,27 @@ async def get_async_session():
     """
     async with AsyncSessionLocal() as async_session:
         yield async_session
+
+
+async def get_unit_of_work(
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Единица работы запроса: одна транзакция на весь запрос.
+
+    CRUD-методы и распределение инвестиций только отправляют изменения в
+    базу (flush), а фиксируются они одним коммитом после успешного
+    выполнения эндпоинта. Если эндпоинт завершился ошибкой, транзакция
+    откатывается при закрытии сессии. Эндпоинт может зафиксировать
+    транзакцию раньше, чтобы дождаться фонового прохода распределения
+    (см. app.services.investment_scheduler.commit_and_wait); завершающий
+    коммит тогда ничего не меняет.
+
+    Долгим эндпоинтам (например, потоковой выгрузке), которым не нужна
+    общая транзакция, достаточно get_async_session.
+
+    Returns:
+        AsyncSession: Асинхронная сессия SQLAlchemy.
+    """
+    yield session
+    await session.commit()
@@ -0,0 +1,167 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi_users.password import PasswordHelper, PasswordHelperProtocol
+
+from app.core.config import settings
+
+
+class PasswordPool:
+    """
+    Хеширование и проверка паролей в ограниченном пуле потоков.
+
+    Argon2 и bcrypt занимают процессор на десятки миллисекунд, и в цикле
+    событий каждый вход блокировал бы все остальные запросы процесса.
+    Обе библиотеки отпускают GIL на время расчета, поэтому в пуле потоков
+    хеши считаются параллельно, а цикл событий продолжает обслуживать
+    запросы. Число потоков ограничено: каждый расчет argon2 занимает
+    десятки мегабайт памяти. Запросы сверх числа потоков ждут в очереди
+    пула.
+
+    Attributes:
+        workers (int): Число потоков, 0 - считать в цикле событий.
+        password_helper (PasswordHelperProtocol): Хешер паролей fastapi-users.
+        in_flight (int): Число выполняющихся и ожидающих расчетов.
+        max_queue_depth (int): Наибольшая длина очереди с момента запуска.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        password_helper: PasswordHelperProtocol | None = None,
+    ):
+        self.workers = workers
+        self.password_helper = password_helper or PasswordHelper()
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Число расчетов, ожидающих свободного потока.
+        """
+        return max(self.in_flight - self.workers, 0)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        if not self.workers:
+            return func(*args)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix='password'
+            )
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Хеширует пароль.
+        """
+        return await self._run(self.password_helper.hash, password)
+
+    async def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, str | None]:
+        """
+        Проверяет пароль и при необходимости возвращает новый хеш.
+
+        Returns:
+            tuple[bool, str or None]: Совпал ли пароль и новый хеш, если
+                                      старый алгоритм устарел.
+        """
+        return await self._run(
+            self.password_helper.verify_and_update,
+            plain_password,
+            hashed_password
+        )
+
+    def stats(self) -> dict[str, int]:
+        """
+        Счетчики пула: потоки, расчеты в работе и длина очереди.
+        """
+        return {
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Останавливает потоки пула; при следующем расчете пул создается
+        заново.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class PooledPasswordHelper(PasswordHelperProtocol):
+    """
+    Хешер паролей для UserManager, результаты которого заранее посчитаны
+    в пуле потоков.
+
+    fastapi-users вызывает hash и verify_and_update синхронно, поэтому
+    UserManager перед вызовом методов BaseUserManager считает нужный
+    результат в пуле (prepare_hash, prepare_verify), а синхронный вызов
+    лишь забирает его. Если результат не подготовлен, он считается на
+    месте, как в PasswordHelper. Экземпляр создается на каждый запрос.
+
+    Attributes:
+        pool (PasswordPool): Пул хеширования паролей.
+    """
+
+    def __init__(self, pool: PasswordPool):
+        self.pool = pool
+        self._prepared: dict[tuple, Any] = {}
+
+    async def prepare_hash(self, password: str) -> None:
+        """
+        Хеширует пароль в пуле для следующего вызова hash.
+        """
+        self._prepared['hash', password] = await self.pool.hash(password)
+
+    async def prepare_verify(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> None:
+        """
+        Проверяет пароль в пуле для следующего вызова verify_and_update.
+        """
+        self._prepared['verify', plain_password, hashed_password] = (
+            await self.pool.verify_and_update(plain_password, hashed_password)
+        )
+
+    def hash(self, password: str) -> str:
+        key = ('hash', password)
+        if key in self._prepared:
+            return self._prepared.pop(key)
+        return self.pool.password_helper.hash(password)
+
+    def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, str | None]:
+        key = ('verify', plain_password, hashed_password)
+        if key in self._prepared:
+            return self._prepared.pop(key)
+        return self.pool.password_helper.verify_and_update(
+            plain_password, hashed_password
+        )
+
+    def generate(self) -> str:
+        return self.pool.password_helper.generate()
+
+
+password_pool = PasswordPool(settings.password_hash_workers)
@@ -1,4 +1,5 @@
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
     BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException
 )
@@ -6,26 +7,88 @@ from fastapi_users.authentication import (
     AuthenticationBackend, BearerTransport, JWTStrategy
 )
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.password import PooledPasswordHelper, password_pool
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+user_cache = TTLCache(
+    ttl=settings.user_cache_ttl,
+    max_size=settings.user_cache_max_size,
+)
+
+
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+    """
+    База данных пользователей с кэшем активных пользователей по id.
+
+    Аутентификация каждого запроса получает пользователя из токена через
+    get; попадание в кэш избавляет от запроса к базе. В кэше хранятся
+    значения колонок, и каждый запрос получает собственный отсоединенный
+    экземпляр User, поэтому экземпляры не переходят между сессиями.
+    Запись сбрасывается при изменении (в том числе деактивации) и удалении
+    пользователя только в текущем процессе, поэтому по умолчанию кэш
+    выключен (см. settings.user_cache_ttl).
+    """
+
+    async def get(self, id: int) -> User | None:
+        """
+        Получает пользователя по id из кэша или из базы данных.
+        """
+        values = user_cache.get(id)
+        if values is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            return user
+        generation = user_cache.generation
+        user = await super().get(id)
+        if user is not None and user.is_active:
+            user_cache.set(
+                id,
+                {
+                    attr.key: getattr(user, attr.key)
+                    for attr in inspect(User).column_attrs
+                },
+                generation
+            )
+        return user
+
+    async def update(self, user: User, update_dict: dict) -> User:
+        """
+        Обновляет пользователя и сбрасывает его запись в кэше.
+        """
+        user = await super().update(user, update_dict)
+        user_cache.invalidate(user.id)
+        return user
+
+    async def delete(self, user: User) -> None:
+        """
+        Удаляет пользователя и сбрасывает его запись в кэше.
+        """
+        await super().delete(user)
+        user_cache.invalidate(user.id)
+
+
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     """
-    Получает экземпляр базы данных пользователей SQLAlchemyUserDatabase.
+    Получает экземпляр базы данных пользователей CachedUserDatabase.
 
     Args:
         session (AsyncSession, optional): Асинхронная сессия SQLAlchemy.
                                         Defaults to Depends(get_async_session).
 
     Returns:
-        SQLAlchemyUserDatabase: Экземпляр базы данных пользователей SQLAlchemy.
+        CachedUserDatabase: Экземпляр базы данных пользователей SQLAlchemy
+                            с кэшем.
     """
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
 
 
 bearer_transport = BearerTransport(tokenUrl='auth/jwt/login')
@@ -55,10 +118,22 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     Управляет созданием, валидацией паролей и другими операциями с
     пользователями.
 
+    Пароли хешируются и проверяются в пуле потоков app.core.password,
+    а не в цикле событий: переопределенные методы заранее считают
+    результат в пуле (см. PooledPasswordHelper) и вызывают методы
+    BaseUserManager.
+
     Attributes:
         ...
 
     Methods:
+        create(user_create: UserCreate, safe: bool, request: Request or None)
+            -> User:
+            Создает пользователя.
+
+        authenticate(credentials: OAuth2PasswordRequestForm) -> User or None:
+            Аутентифицирует пользователя по email и паролю.
+
         validate_password(password: str, user: UserCreate or User) -> None:
             Валидирует пароль пользователя.
 
@@ -66,6 +141,45 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
             Вызывается после регистрации пользователя.
     """
 
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Request | None = None,
+    ) -> User:
+        """
+        Создает пользователя, хешируя пароль в пуле потоков.
+        """
+        await self.password_helper.prepare_hash(user_create.password)
+        return await super().create(user_create, safe, request)
+
+    async def authenticate(
+        self,
+        credentials: OAuth2PasswordRequestForm,
+    ) -> User | None:
+        """
+        Аутентифицирует пользователя, проверяя пароль в пуле потоков.
+
+        Для неизвестного email пароль тоже хешируется, чтобы время ответа
+        не выдавало, зарегистрирован ли он.
+        """
+        user = await self.user_db.get_by_email(credentials.username)
+        if user is None:
+            await self.password_helper.prepare_hash(credentials.password)
+        else:
+            await self.password_helper.prepare_verify(
+                credentials.password, user.hashed_password
+            )
+        return await super().authenticate(credentials)
+
+    async def _update(self, user: User, update_dict: dict) -> User:
+        """
+        Обновляет пользователя, хешируя новый пароль в пуле потоков.
+        """
+        if update_dict.get('password') is not None:
+            await self.password_helper.prepare_hash(update_dict['password'])
+        return await super()._update(user, update_dict)
+
     async def validate_password(
         self,
         password: str,
@@ -114,7 +228,7 @@ async def get_user_manager(user_db=Depends(get_user_db)):
     Returns:
         UserManager: Менеджер пользователей.
     """
-    yield UserManager(user_db)
+    yield UserManager(user_db, PooledPasswordHelper(password_pool))
 
 
 fastapi_users = FastAPIUsers[User, int](
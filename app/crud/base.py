@@ -1,10 +1,11 @@
-from typing import Generic, Type, TypeVar
-
-from fastapi.encoders import jsonable_encoder
+import operator
+from typing import Any, Generic, Type, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (Row, false, insert, inspect, select, true, tuple_,
+                        update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 
 from app.core.db import Base
 from app.models import User
@@ -14,6 +15,33 @@ ModelType = TypeVar('ModelType', bound=Base)
 CreateSchemaType = TypeVar('CreateSchemaType', bound=BaseModel)
 UpdateSchemaType = TypeVar('UpdateSchemaType', bound=BaseModel)
 
+# Операторы фильтров списков (см. CRUDBase.filter_conditions).
+FILTER_LOOKUPS = {
+    '': operator.eq,
+    'gte': operator.ge,
+    'lte': operator.le,
+}
+
+# Конструкторы INSERT ... ON CONFLICT для поддерживаемых СУБД.
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def upsert(session: AsyncSession, model: Type[Base]):
+    """
+    INSERT ... ON CONFLICT в модель для СУБД сессии.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        model (Type[Base]): Модель базы данных.
+
+    Returns:
+        Insert: Вставка с методом on_conflict_do_update.
+    """
+    return UPSERT_INSERTS[session.get_bind().dialect.name](model)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
@@ -21,8 +49,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     Attributes:
         model (Type[ModelType]): Модель базы данных.
+        sort_fields (tuple[str, ...]): Поля, по которым можно сортировать
+                                       списки.
     """
 
+    sort_fields = ('create_date', 'full_amount')
+
     def __init__(
         self,
         model: Type[ModelType]
@@ -37,6 +69,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Получает объект по его идентификатору.
 
+        Объект ищется сначала в identity map сессии, поэтому в рамках
+        запроса (одна сессия на запрос, см. app.core.db) он загружается из
+        базы не больше одного раза, даже если его получают и валидаторы,
+        и CRUD.
+
         Args:
             obj_id (int): Идентификатор объекта.
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
@@ -44,29 +81,163 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             ModelType or None: Найденный объект или None, если не найден.
         """
-        db_obj = await session.execute(
-            select(self.model).where(
-                self.model.id == obj_id
+        return await session.get(self.model, obj_id)
+
+    async def get_many(
+            self,
+            obj_ids: list[int],
+            session: AsyncSession,
+    ) -> dict[int, ModelType]:
+        """
+        Получает несколько объектов по идентификаторам.
+
+        Объекты, уже загруженные в сессию, берутся из identity map, а
+        остальные (и устаревшие после expire) загружаются одним запросом
+        с IN.
+
+        Args:
+            obj_ids (list[int]): Идентификаторы объектов.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            dict[int, ModelType]: Найденные объекты по идентификаторам;
+                                  ненайденных идентификаторов в нем нет.
+        """
+        objs = {}
+        missing_ids = []
+        for obj_id in dict.fromkeys(obj_ids):
+            key = session.identity_key(self.model, obj_id)
+            obj = session.identity_map.get(key)
+            if obj is None or inspect(obj).expired_attributes:
+                missing_ids.append(obj_id)
+            else:
+                objs[obj_id] = obj
+        if missing_ids:
+            loaded = await session.scalars(
+                select(self.model).where(self.model.id.in_(missing_ids))
             )
-        )
-        return db_obj.scalars().first()
+            objs.update((obj.id, obj) for obj in loaded)
+        return objs
+
+    def filter_conditions(self, filters: dict[str, Any]) -> list:
+        """
+        Строит условия выборки по фильтрам списка.
+
+        Ключ фильтра - имя поля, к которому через "__" может быть добавлен
+        оператор: gte (не меньше) или lte (не больше); без оператора
+        проверяется равенство. Фильтры со значением None пропускаются.
+
+        Args:
+            filters (dict[str, Any]): Фильтры, например
+                                      {'full_amount__gte': 100}.
+
+        Returns:
+            list: Условия для Select.where.
+        """
+        conditions = []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            field, _, lookup = name.partition('__')
+            if isinstance(value, bool):
+                # Литерал вместо параметра, чтобы условие совпадало с
+                # предикатом частичного индекса открытой очереди.
+                value = true() if value else false()
+            conditions.append(
+                FILTER_LOOKUPS[lookup](getattr(self.model, field), value)
+            )
+        return conditions
 
     async def get_multi(
             self,
-            session: AsyncSession
-    ) -> list[ModelType]:
+            session: AsyncSession,
+            limit: int | None = None,
+            after: tuple[Any, int] | None = None,
+            where: tuple = (),
+            fields: tuple[str, ...] | None = None,
+            sort: str = 'create_date',
+            filters: dict[str, Any] | None = None,
+    ) -> list[ModelType] | list[Row]:
         """
-        Получает список всех объектов модели.
+        Получает список объектов модели в порядке (поле сортировки, id).
+
+        Постраничная выдача выполняется по ключу (keyset): страница
+        начинается сразу после ключа after, поэтому ее стоимость не зависит
+        от номера страницы.
+
+        Если переданы fields, выбираются только эти колонки (и ключ
+        сортировки) без загрузки ORM-объектов.
 
         Args:
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            limit (int or None, default = None): Максимальное число объектов.
+            after (tuple or None, default = None): Ключ (значение поля
+                            сортировки, id), после которого начинается
+                            выборка.
+            where (tuple, default = ()): Дополнительные условия выборки.
+            fields (tuple[str, ...] or None, default = None): Колонки,
+                            которые нужно выбрать.
+            sort (str, default = 'create_date'): Поле сортировки из
+                            sort_fields, с "-" перед именем - по убыванию.
+            filters (dict[str, Any] or None, default = None): Фильтры
+                            (см. filter_conditions).
 
         Returns:
-            list[ModelType]: Список всех объектов модели.
+            list[ModelType] or list[Row]: Список объектов модели или строк
+                                          с выбранными колонками.
         """
-        db_objs = await session.execute(select(self.model))
+        sort_field = sort.removeprefix('-')
+        descending = sort.startswith('-')
+        key = (getattr(self.model, sort_field), self.model.id)
+        if fields is None:
+            query = select(self.model)
+        else:
+            query = select(*(
+                getattr(self.model, field)
+                for field in dict.fromkeys(('id', sort_field, *fields))
+            ))
+        query = query.where(
+            *where, *self.filter_conditions(filters or {})
+        ).order_by(
+            *(column.desc() if descending else column for column in key)
+        )
+        if after is not None:
+            after = tuple_(*after, types=[column.type for column in key])
+            query = query.where(
+                tuple_(*key) < after if descending else tuple_(*key) > after
+            )
+        if limit is not None:
+            query = query.limit(limit)
+        db_objs = await session.execute(query)
+        if fields is not None:
+            return db_objs.all()
         return db_objs.scalars().all()
 
+    async def stream_multi(
+            self,
+            session: AsyncSession,
+            chunk_size: int,
+    ) -> AsyncResult:
+        """
+        Читает все строки таблицы модели потоком в порядке (create_date, id).
+
+        Строки выбираются серверным курсором порциями по chunk_size и не
+        превращаются в ORM-объекты, поэтому память не зависит от размера
+        таблицы.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            chunk_size (int): Число строк в одной порции.
+
+        Returns:
+            AsyncResult: Поток строк со всеми колонками таблицы.
+        """
+        return await session.stream(
+            select(*self.model.__table__.columns).order_by(
+                self.model.create_date, self.model.id
+            ).execution_options(yield_per=chunk_size)
+        )
+
     async def create(
             self,
             obj_in: CreateSchemaType,
@@ -76,6 +247,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Создает новый объект модели в базе данных.
 
+        Объект вставляется одним INSERT ... RETURNING, поэтому после вставки
+        его не нужно перечитывать. Транзакция не фиксируется
+        (см. app.core.db.get_unit_of_work).
+
         Args:
             obj_in (CreateSchemaType): Данные для создания объекта.
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
@@ -87,11 +262,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = obj_in.model_dump()
         if user is not None:
             obj_in_data['user_id'] = user.id
-        db_obj = self.model(**obj_in_data)
-        session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        return await session.scalar(
+            insert(self.model).values(**obj_in_data).returning(self.model)
+        )
 
     async def update(
             self,
@@ -102,6 +275,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Обновляет существующий объект модели в базе данных.
 
+        Новые значения и уже измененные, но не записанные поля объекта
+        записываются одним UPDATE ... RETURNING. Транзакция не фиксируется.
+
         Args:
             db_obj (ModelType): Существующий объект модели.
             obj_in (UpdateSchemaType): Новые данные для обновления.
@@ -110,15 +286,20 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             ModelType: Обновленный объект модели.
         """
-        obj_data = jsonable_encoder(db_obj)
         update_data = obj_in.model_dump(exclude_unset=True)
-
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
+        state = inspect(db_obj)
+        values = {}
+        for column in state.mapper.column_attrs:
+            if column.key in update_data:
+                values[column.key] = update_data[column.key]
+            elif state.attrs[column.key].history.has_changes():
+                values[column.key] = getattr(db_obj, column.key)
+        if values:
+            db_obj = await session.scalar(
+                update(self.model).where(
+                    self.model.id == db_obj.id
+                ).values(**values).returning(self.model)
+            )
         return db_obj
 
     async def remove(
@@ -127,7 +308,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             session: AsyncSession,
     ) -> ModelType:
         """
-        Удаляет объект модели из базы данных.
+        Удаляет объект модели из базы данных. Транзакция не фиксируется.
 
         Args:
             db_obj (ModelType): Объект модели для удаления.
@@ -137,5 +318,5 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             ModelType: Удаленный объект модели.
         """
         await session.delete(db_obj)
-        await session.commit()
+        await session.flush()
         return db_obj
@@ -1,13 +1,21 @@
-from sqlalchemy import select
+import re
+
+from sqlalchemy import (Row, false, func, insert, inspect, literal_column,
+                        select, tuple_)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import charity_project_cache
 from app.crud.base import CRUDBase
+from app.crud.stats import stats_crud
 from app.models import CharityProject, User
+from app.models.charity_project import (charityproject_fts, normalize_name,
+                                        search_document)
 from app.schemas.charity_project import (
     CharityProjectCreate,
     CharityProjectUpdate
 )
-from app.services.investment import investment
+from app.services.investment import lock_investment
+from app.services.investment_scheduler import run_investment
 
 
 class CRUDCharityProject(CRUDBase[
@@ -26,7 +34,11 @@ class CRUDCharityProject(CRUDBase[
         user: User | None = None
     ) -> CharityProject:
         """
-        Создает новый проект и запускает инвестиционный процесс.
+        Создает новый проект и распределяет по нему открытые пожертвования.
+
+        Вставка, обновление статистики и распределение выполняются в одной
+        транзакции под блокировкой распределения. Вместе с названием
+        записывается его нормализованная форма (см. normalize_name).
 
         Args:
             obj_in (CharityProjectCreate): Данные для создания проекта.
@@ -36,34 +48,161 @@ class CRUDCharityProject(CRUDBase[
         Returns:
             CharityProject: Созданный проект.
         """
-        project = await super().create(obj_in, session, user)
-        await investment(session)
-        await session.refresh(project)
+        await lock_investment(session)
+        project = await session.scalar(
+            insert(CharityProject).values(
+                **obj_in.model_dump(),
+                name_normalized=normalize_name(obj_in.name)
+            ).returning(CharityProject)
+        )
+        await stats_crud.add(session, open_projects=1)
+        await run_investment(session, project)
+        charity_project_cache.invalidate_on_commit(session)
+        return project
+
+    async def update(
+        self,
+        db_obj: CharityProject,
+        obj_in: CharityProjectUpdate,
+        session: AsyncSession,
+    ) -> CharityProject:
+        """
+        Обновляет проект; кэш списка проектов сбрасывается после коммита.
+
+        Если проект закрывается (см. check_project_before_edit), это
+        учитывается в статистике. Если у открытого проекта изменилась
+        требуемая сумма, для него выполняется инкрементальный проход
+        распределения: в проект переводятся остатки старейших открытых
+        пожертвований, пока он не будет заполнен.
+
+        Args:
+            db_obj (CharityProject): Существующий проект.
+            obj_in (CharityProjectUpdate): Новые данные проекта.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            CharityProject: Обновленный проект.
+        """
+        await lock_investment(session)
+        history = inspect(db_obj).attrs.fully_invested.history
+        closed = db_obj.fully_invested and history.has_changes()
+        full_amount = db_obj.full_amount
+        if obj_in.name is not None:
+            # Через validate_name обновляет и нормализованное название.
+            db_obj.name = obj_in.name
+        project = await super().update(db_obj, obj_in, session)
+        if closed:
+            await stats_crud.add(session, open_projects=-1, closed_projects=1)
+        elif project.full_amount != full_amount:
+            await run_investment(session, project)
+        charity_project_cache.invalidate_on_commit(session)
         return project
 
-    async def get_project_id_by_name(
+    async def remove(
+        self,
+        db_obj: CharityProject,
+        session: AsyncSession,
+    ) -> CharityProject:
+        """
+        Удаляет проект и учитывает это в статистике; кэш списка проектов
+        сбрасывается после коммита.
+
+        Args:
+            db_obj (CharityProject): Проект для удаления.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            CharityProject: Удаленный проект.
+        """
+        await lock_investment(session)
+        project = await super().remove(db_obj, session)
+        if project.fully_invested:
+            await stats_crud.add(session, closed_projects=-1)
+        else:
+            await stats_crud.add(session, open_projects=-1)
+        charity_project_cache.invalidate_on_commit(session)
+        return project
+
+    async def search(
             self,
-            project_name: str,
             session: AsyncSession,
-    ) -> int | None:
+            query: str,
+            limit: int,
+            after: tuple[float, int] | None = None,
+    ) -> list[Row]:
         """
-        Получает идентификатор проекта по его названию.
+        Ищет проекты по словам из названия и описания.
+
+        Используется полнотекстовый индекс: таблица FTS5 в SQLite и
+        GIN-индекс по tsvector в PostgreSQL (см. app.models.charity_project).
+        Результаты упорядочены по релевантности rank (меньше - выше:
+        bm25 в SQLite, ts_rank_cd со знаком минус в PostgreSQL) и id,
+        поэтому постраничная выдача идет по ключу (rank, id).
 
         Args:
-            project_name (str): Название проекта.
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            query (str): Поисковый запрос; в SQLite в нем учитываются
+                         только слова, все они должны найтись в проекте.
+            limit (int): Максимальное число результатов.
+            after (tuple[float, int] or None): Ключ (rank, id), после
+                                               которого начинается выдача.
 
         Returns:
-            int or None: Идентификатор найденного проекта или None,
-                         если проект не найден.
+            list[Row]: Строки с колонками проекта и rank.
         """
-        db_project_id = await session.execute(
-            select(CharityProject.id).where(
-                CharityProject.name == project_name
+        columns = CharityProject.__table__.columns
+        if session.get_bind().dialect.name == 'postgresql':
+            tsquery = func.websearch_to_tsquery(
+                literal_column("'simple'"), query
+            )
+            rank = -func.ts_rank_cd(search_document, tsquery)
+            stmt = select(*columns, rank.label('rank')).where(
+                search_document.op('@@')(tsquery)
             )
+        else:
+            words = re.findall(r'\w+', query)
+            if not words:
+                return []
+            rank = func.bm25(literal_column(charityproject_fts.name))
+            stmt = select(*columns, rank.label('rank')).join(
+                charityproject_fts,
+                charityproject_fts.c.rowid == CharityProject.id
+            ).where(
+                literal_column(charityproject_fts.name).match(
+                    ' '.join(f'"{word}"' for word in words)
+                )
+            )
+        if after is not None:
+            stmt = stmt.where(tuple_(rank, CharityProject.id) > tuple_(*after))
+        projects = await session.execute(
+            stmt.order_by(rank, CharityProject.id).limit(limit)
+        )
+        return projects.all()
+
+    async def get_open_projects(
+            self,
+            session: AsyncSession,
+    ):
+        """
+        Получает открытые проекты в порядке очереди распределения.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            list: Строки с полями id, name, full_amount и invested_amount.
+        """
+        projects = await session.execute(
+            select(
+                CharityProject.id,
+                CharityProject.name,
+                CharityProject.full_amount,
+                CharityProject.invested_amount
+            ).where(
+                CharityProject.fully_invested == false()
+            ).order_by(CharityProject.create_date, CharityProject.id)
         )
-        db_project_id = db_project_id.scalars().first()
-        return db_project_id
+        return projects.all()
 
     async def get_projects_by_completion_rate(
             self,
@@ -1,12 +1,16 @@
-from sqlalchemy import select
+from sqlalchemy import Row, false, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pydantic import BaseModel
 
 from app.crud.base import CRUDBase
+from app.crud.donation_summary import donation_summary_crud
+from app.crud.stats import stats_crud
 from app.models import Donation, User
 from app.schemas.donation import DonationCreate
-from app.services.investment import investment
+from app.services.investment import lock_investment
+from app.services.investment_scheduler import (run_investment,
+                                               wait_for_investment)
 
 
 class CRUDDonation(CRUDBase[
@@ -25,7 +29,10 @@ class CRUDDonation(CRUDBase[
         user: User | None = None
     ) -> Donation:
         """
-        Создает новое пожертвование и запускает инвестиционный процесс.
+        Создает новое пожертвование и распределяет его по открытым проектам.
+
+        Вставка, обновление итогов пользователя и статистики и распределение
+        выполняются в одной транзакции под блокировкой распределения.
 
         Args:
             obj_in (DonationCreate): Данные для создания пожертвования.
@@ -35,30 +42,129 @@ class CRUDDonation(CRUDBase[
         Returns:
             Donation: Созданное пожертвование.
         """
+        await lock_investment(session)
         donation = await super().create(obj_in, session, user)
-        await investment(session)
-        await session.refresh(donation)
+        await self.count_donations(session, user, 1, donation.full_amount)
+        await run_investment(session, donation, wait=False)
         return donation
 
-    async def get_by_user(
+    async def create_many(
         self,
+        objs_in: list[DonationCreate],
         session: AsyncSession,
-        user: User
+        user: User | None = None
     ) -> list[Donation]:
         """
-        Получает все пожертвования, сделанные пользователем.
+        Создает пачку пожертвований и один раз запускает инвестиционный
+        процесс для всей пачки.
+
+        Пожертвования вставляются одним многострочным INSERT, а вся операция
+        завершается единственным коммитом. Блокировка распределения берется
+        до вставки, чтобы транзакция не удерживала запись в ожидании
+        блокировки. Если распределение выполняет фоновый планировщик,
+        пожертвования перечитываются в commit_and_wait после его прохода.
+
+        Args:
+            objs_in (list[DonationCreate]): Данные для создания пожертвований.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user (User or None): Пользователь, создающий пожертвования.
+
+        Returns:
+            list[Donation]: Созданные пожертвования в порядке входных данных.
+        """
+        objs_in_data = [obj_in.model_dump() for obj_in in objs_in]
+        if user is not None:
+            for obj_in_data in objs_in_data:
+                obj_in_data['user_id'] = user.id
+        await lock_investment(session)
+        donation_ids = await session.scalars(
+            insert(Donation).returning(
+                Donation.id, sort_by_parameter_order=True
+            ),
+            objs_in_data
+        )
+        donation_ids = donation_ids.all()
+        await self.count_donations(
+            session,
+            user,
+            len(objs_in_data),
+            sum(obj_in_data['full_amount'] for obj_in_data in objs_in_data)
+        )
+        await run_investment(session)
+        donations = await self.get_many(donation_ids, session)
+        donations = [donations[donation_id] for donation_id in donation_ids]
+        wait_for_investment(session, *donations)
+        return donations
+
+    async def count_donations(
+        self,
+        session: AsyncSession,
+        user: User | None,
+        count: int,
+        full_amount: int
+    ) -> None:
+        """
+        Учитывает новые пожертвования в итогах пользователя и в общей
+        статистике.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user (User or None): Пользователь, сделавший пожертвования.
+            count (int): Число новых пожертвований.
+            full_amount (int): Их общая сумма.
+        """
+        new_donor = False
+        if user is not None:
+            new_donor = await donation_summary_crud.add_donations(
+                session, user.id, count, full_amount
+            )
+        await stats_crud.add(
+            session, donated_amount=full_amount, donors_count=int(new_donor)
+        )
+
+    async def get_open_remaining_amounts(
+        self,
+        session: AsyncSession
+    ) -> list[int]:
+        """
+        Получает нераспределенные остатки открытых пожертвований в порядке
+        очереди распределения.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            list[int]: Остатки пожертвований.
+        """
+        amounts = await session.scalars(
+            select(Donation.full_amount - Donation.invested_amount).where(
+                Donation.fully_invested == false()
+            ).order_by(Donation.create_date, Donation.id)
+        )
+        return amounts.all()
+
+    async def get_by_user(
+        self,
+        session: AsyncSession,
+        user: User,
+        **params,
+    ) -> list[Donation] | list[Row]:
+        """
+        Получает пожертвования, сделанные пользователем.
 
         Args:
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
             user (User): Пользователь, чьи пожертвования нужно получить.
+            **params: Параметры постраничной выдачи, сортировки, фильтров
+                      и набора полей (см. CRUDBase.get_multi).
 
         Returns:
-            list[Donation]: Список пожертвований.
+            list[Donation] or list[Row]: Список пожертвований или строк
+                                         с выбранными колонками.
         """
-        donations = await session.scalars(
-            select(Donation).where(Donation.user_id == user.id)
+        return await self.get_multi(
+            session, where=(Donation.user_id == user.id,), **params
         )
-        return donations.all()
 
 
 donation_crud = CRUDDonation(Donation)
@@ -0,0 +1,133 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pydantic import BaseModel
+
+from app.crud.base import CRUDBase, upsert
+from app.models import Donation, DonationSummary, User
+
+
+class CRUDDonationSummary(CRUDBase[
+    DonationSummary,
+    BaseModel,
+    BaseModel
+]):
+    """
+    Класс для чтения и обновления итогов пожертвований пользователей.
+
+    Итоги только увеличиваются на суммы изменений, поэтому обновления
+    выполняются одним запросом без чтения строки. Транзакция не
+    фиксируется (см. app.core.db.get_unit_of_work).
+    """
+
+    async def get_by_user(
+        self,
+        session: AsyncSession,
+        user: User
+    ) -> DonationSummary:
+        """
+        Получает итоги пожертвований пользователя.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user (User): Пользователь.
+
+        Returns:
+            DonationSummary: Итоги пользователя; нулевые, если он еще
+                             не делал пожертвований.
+        """
+        summary = await session.scalar(
+            select(DonationSummary).where(DonationSummary.user_id == user.id)
+        )
+        if summary is None:
+            return DonationSummary(
+                user_id=user.id,
+                donations_count=0,
+                full_amount=0,
+                invested_amount=0
+            )
+        return summary
+
+    async def add_donations(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        count: int,
+        full_amount: int
+    ) -> bool:
+        """
+        Учитывает новые пожертвования пользователя.
+
+        Строка итогов создается при первом пожертвовании одним
+        INSERT ... ON CONFLICT DO UPDATE.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user_id (int): Идентификатор пользователя.
+            count (int): Число новых пожертвований.
+            full_amount (int): Их общая сумма.
+
+        Returns:
+            bool: True, если это первые пожертвования пользователя.
+        """
+        stmt = upsert(session, DonationSummary).values(
+            user_id=user_id,
+            donations_count=count,
+            full_amount=full_amount,
+            invested_amount=0
+        )
+        excluded = stmt.excluded
+        donations_count = await session.scalar(stmt.on_conflict_do_update(
+            index_elements=[DonationSummary.user_id],
+            set_={
+                'donations_count': (
+                    DonationSummary.donations_count + excluded.donations_count
+                ),
+                'full_amount': (
+                    DonationSummary.full_amount + excluded.full_amount
+                ),
+            }
+        ).returning(DonationSummary.donations_count))
+        return donations_count == count
+
+    async def add_invested(
+        self,
+        session: AsyncSession,
+        allocations: list[dict]
+    ) -> None:
+        """
+        Учитывает суммы, распределенные из пожертвований за проход.
+
+        Итог пользователя находится по пожертвованию подзапросом, поэтому
+        обновление выполняется одним executemany UPDATE.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            allocations (list[dict]): Записи журнала распределения прохода.
+        """
+        invested = defaultdict(int)
+        for allocation in allocations:
+            invested[allocation['donation_id']] += allocation['amount']
+        if not invested:
+            return
+        summary = DonationSummary.__table__
+        await session.execute(
+            update(summary).where(
+                summary.c.user_id == select(Donation.user_id).where(
+                    Donation.id == bindparam('b_donation_id')
+                ).scalar_subquery()
+            ).values(
+                invested_amount=(
+                    summary.c.invested_amount + bindparam('b_amount')
+                )
+            ),
+            [
+                {'b_donation_id': donation_id, 'b_amount': amount}
+                for donation_id, amount in invested.items()
+            ]
+        )
+
+
+donation_summary_crud = CRUDDonationSummary(DonationSummary)
@@ -0,0 +1,67 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pydantic import BaseModel
+
+from app.crud.base import CRUDBase
+from app.models import Investment
+
+
+class CRUDInvestment(CRUDBase[
+    Investment,
+    BaseModel,
+    BaseModel
+]):
+    """
+    Класс для чтения журнала распределения инвестиций.
+
+    Записи журнала создаются только при распределении
+    (app.services.investment).
+    """
+
+    async def get_by_project(
+        self,
+        project_id: int,
+        session: AsyncSession
+    ) -> list[Investment]:
+        """
+        Получает пожертвования, вложенные в проект.
+
+        Args:
+            project_id (int): Идентификатор проекта.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            list[Investment]: Записи журнала в порядке распределения.
+        """
+        investments = await session.scalars(
+            select(Investment).where(
+                Investment.project_id == project_id
+            ).order_by(Investment.id)
+        )
+        return investments.all()
+
+    async def get_by_donation(
+        self,
+        donation_id: int,
+        session: AsyncSession
+    ) -> list[Investment]:
+        """
+        Получает проекты, в которые вложено пожертвование.
+
+        Args:
+            donation_id (int): Идентификатор пожертвования.
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            list[Investment]: Записи журнала в порядке распределения.
+        """
+        investments = await session.scalars(
+            select(Investment).where(
+                Investment.donation_id == donation_id
+            ).order_by(Investment.id)
+        )
+        return investments.all()
+
+
+investment_crud = CRUDInvestment(Investment)
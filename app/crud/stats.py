@@ -0,0 +1,125 @@
+from typing import Any
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pydantic import BaseModel
+
+from app.crud.base import CRUDBase, upsert
+from app.models import CharityProject, Stats
+
+
+# Идентификатор единственной строки статистики.
+STATS_ID = 1
+
+
+class CRUDStats(CRUDBase[
+    Stats,
+    BaseModel,
+    BaseModel
+]):
+    """
+    Класс для чтения и обновления общей статистики фонда.
+
+    Счетчики изменяются на разницу одним INSERT ... ON CONFLICT DO UPDATE,
+    поэтому строка создается при первом изменении. Транзакция не
+    фиксируется (см. app.core.db.get_unit_of_work).
+    """
+
+    async def get_stats(self, session: AsyncSession) -> Stats:
+        """
+        Получает статистику фонда.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            Stats: Статистика; нулевая, если данных еще нет.
+        """
+        stats = await self.get(STATS_ID, session)
+        if stats is None:
+            return Stats(
+                id=STATS_ID,
+                **{column: 0 for column in self.counters()}
+            )
+        return stats
+
+    @staticmethod
+    def counters() -> list[str]:
+        """
+        Имена счетчиков статистики.
+        """
+        return [
+            column.key for column in Stats.__table__.columns
+            if not column.primary_key
+        ]
+
+    async def add(self, session: AsyncSession, **deltas: Any) -> None:
+        """
+        Изменяет счетчики на указанные разницы.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            **deltas: Разницы счетчиков: числа или скалярные подзапросы.
+        """
+        stmt = upsert(session, Stats).values(
+            id=STATS_ID,
+            **{column: deltas.get(column, 0) for column in self.counters()}
+        )
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[Stats.id],
+            set_={
+                column: getattr(Stats, column) + stmt.excluded[column]
+                for column in deltas
+            }
+        ))
+
+    async def add_invested(
+        self,
+        session: AsyncSession,
+        allocations: list[dict]
+    ) -> None:
+        """
+        Учитывает проход распределения: вложенную сумму и закрытые проекты.
+
+        Проекты прохода до него были открыты, поэтому закрытые среди них -
+        закрытые за проход. Изменения объектов прохода должны быть уже
+        отправлены в базу.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            allocations (list[dict]): Записи журнала распределения прохода.
+        """
+        if not allocations:
+            return
+        closed_projects = select(func.count()).where(
+            CharityProject.id.in_(
+                {allocation['project_id'] for allocation in allocations}
+            ),
+            CharityProject.fully_invested == true()
+        ).scalar_subquery()
+        await self.add(
+            session,
+            invested_amount=sum(
+                allocation['amount'] for allocation in allocations
+            ),
+            open_projects=-closed_projects,
+            closed_projects=closed_projects,
+        )
+
+    async def set_counters(self, session: AsyncSession, **values: int) -> None:
+        """
+        Записывает счетчики целиком (см. app.services.stats).
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            **values: Новые значения счетчиков.
+        """
+        stmt = upsert(session, Stats).values(id=STATS_ID, **values)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[Stats.id],
+            set_={column: stmt.excluded[column] for column in values}
+        ))
+
+
+stats_crud = CRUDStats(Stats)
@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from app.core.config import settings
 from app.api.routers import main_router
 from app.core.init_db import create_first_superuser
+from app.core.password import password_pool
+from app.services.investment_scheduler import investment_scheduler
 
 
 @asynccontextmanager
@@ -12,7 +14,9 @@ async def lifespan(app: FastAPI):
     """
     Асинхронный контекстный менеджер для жизненного цикла приложения.
 
-    Перед стартом приложения создает первого суперпользователя.
+    Перед стартом приложения создает первого суперпользователя и, если
+    включено в настройках, запускает планировщик распределения инвестиций.
+    После остановки приложения останавливает пул хеширования паролей.
 
     Parameters:
         app (FastAPI): Экземпляр FastAPI приложения.
@@ -21,7 +25,11 @@ async def lifespan(app: FastAPI):
         None
     """
     await create_first_superuser()
+    if settings.investment_scheduler_enabled:
+        investment_scheduler.start()
     yield
+    await investment_scheduler.stop()
+    password_pool.shutdown()
 
 
 app = FastAPI(
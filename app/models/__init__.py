@@ -1,3 +1,6 @@
 from .user import User  # noqa
 from .donation import Donation  # noqa
 from .charity_project import CharityProject  # noqa
+from .investment import Investment  # noqa
+from .donation_summary import DonationSummary  # noqa
+from .stats import Stats  # noqa
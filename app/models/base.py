@@ -1,11 +1,64 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import Integer, Boolean, DateTime, CheckConstraint
-from sqlalchemy.orm import Mapped, mapped_column, validates
+from sqlalchemy import (Integer, Boolean, DateTime, CheckConstraint, Index,
+                        text)
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, validates
 
 from app.core.db import Base
 
 
+def utc_now() -> datetime:
+    """
+    Текущее время UTC без часового пояса: в таком виде хранятся даты
+    закрытия и записи журнала распределения.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def open_queue_index(table_name: str) -> Index:
+    """
+    Частичный индекс очереди открытых объектов.
+
+    Покрывает запросы распределения инвестиций
+    `WHERE fully_invested = false ORDER BY create_date, id`, поэтому их
+    стоимость не зависит от объема закрытой истории.
+
+    Args:
+        table_name (str): Имя таблицы.
+
+    Returns:
+        Index: Индекс по (create_date, id) только для открытых строк.
+    """
+    return Index(
+        f'ix_{table_name}_open_queue',
+        'create_date',
+        'id',
+        sqlite_where=text('fully_invested = 0'),
+        postgresql_where=text('NOT fully_invested'),
+    )
+
+
+def list_indexes(table_name: str) -> tuple[Index, ...]:
+    """
+    Индексы для постраничной выдачи, фильтрации и сортировки списков.
+
+    Args:
+        table_name (str): Имя таблицы.
+
+    Returns:
+        tuple[Index, ...]: Индексы по ключам сортировки (create_date, id) и
+                           (full_amount, id) и по дате закрытия. Фильтр
+                           открытых объектов обслуживает индекс открытой
+                           очереди (см. open_queue_index), закрытых -
+                           индекс (create_date, id).
+    """
+    return (
+        Index(f'ix_{table_name}_create_date_id', 'create_date', 'id'),
+        Index(f'ix_{table_name}_full_amount_id', 'full_amount', 'id'),
+        Index(f'ix_{table_name}_close_date', 'close_date'),
+    )
+
+
 class BaseModel(Base):
     __abstract__ = True
 
@@ -27,13 +80,19 @@ class BaseModel(Base):
     )
     close_date: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
-    __table_args__ = (
-        CheckConstraint('full_amount > 0', name='check_full_amount_positive'),
-    )
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            CheckConstraint(
+                'full_amount > 0', name='check_full_amount_positive'
+            ),
+            open_queue_index(cls.__tablename__),
+            *list_indexes(cls.__tablename__),
+        )
 
     @validates('fully_invested')
     def validate_fully_invested(self, key, value):
         if value:
             if self.close_date is None:
-                self.close_date = datetime.now()
+                self.close_date = utc_now()
         return value
@@ -1,16 +1,103 @@
-from sqlalchemy import String, Text, CheckConstraint
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (DDL, CheckConstraint, Index, Integer, String, Text,
+                        column, event, func, literal_column, table)
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, validates
 
-from .base import BaseModel
+from .base import BaseModel, list_indexes, open_queue_index
+
+
+def normalize_name(name: str) -> str:
+    """
+    Название проекта для проверки уникальности: без пробелов по краям и
+    без учета регистра.
+
+    Регистр сворачивается в Python, а не функцией lower() базы данных:
+    встроенная lower() в SQLite меняет только латиницу.
+    """
+    return name.strip().casefold()
 
 
 class CharityProject(BaseModel):
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    # Названия проектов уникальны без учета регистра и пробелов по краям;
+    # колонку заполняет validate_name.
+    name_normalized: Mapped[str] = mapped_column(
+        Text, index=True, unique=True, nullable=False
+    )
     description: Mapped[str] = mapped_column(Text, nullable=False)
 
-    __table_args__ = (
-        CheckConstraint(
-            'LENGTH(name) >= 1 AND LENGTH(description) >= 1',
-            name='check_name_and_description_length'
-        ),
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            CheckConstraint(
+                'LENGTH(name) >= 1 AND LENGTH(description) >= 1',
+                name='check_name_and_description_length'
+            ),
+            open_queue_index(cls.__tablename__),
+            *list_indexes(cls.__tablename__),
+        )
+
+    @validates('name')
+    def validate_name(self, key, value):
+        self.name_normalized = normalize_name(value)
+        return value
+
+
+# Полнотекстовый документ проекта в PostgreSQL. Конфигурация и разделитель
+# записаны литералами, чтобы выражение в запросе совпадало с выражением
+# GIN-индекса.
+search_document = func.to_tsvector(
+    literal_column("'simple'"),
+    CharityProject.name + literal_column("' '") + CharityProject.description
+)
+CharityProject.__table__.append_constraint(
+    Index(
+        'ix_charityproject_search',
+        search_document,
+        postgresql_using='gin',
+    ).ddl_if(dialect='postgresql')
+)
+
+# Полнотекстовый индекс проектов в SQLite: таблица FTS5 с внешним
+# содержимым (charityproject). Индекс обновляется триггерами в той же
+# транзакции, что и строки проектов, включая вставки в обход CRUD.
+charityproject_fts = table(
+    'charityproject_fts',
+    column('rowid', Integer),
+    column('name', String),
+    column('description', Text),
+)
+SEARCH_INDEX_DDL = (
+    'CREATE VIRTUAL TABLE charityproject_fts USING fts5('
+    "name, description, content='charityproject', content_rowid='id')",
+    'CREATE TRIGGER charityproject_fts_insert AFTER INSERT ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts (rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); '
+    'END',
+    'CREATE TRIGGER charityproject_fts_delete AFTER DELETE ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts '
+    '(charityproject_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'END',
+    'CREATE TRIGGER charityproject_fts_update '
+    'AFTER UPDATE OF name, description ON charityproject '
+    'BEGIN '
+    'INSERT INTO charityproject_fts '
+    '(charityproject_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO charityproject_fts (rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); '
+    'END',
+)
+for statement in SEARCH_INDEX_DDL:
+    event.listen(
+        CharityProject.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite')
     )
+event.listen(
+    CharityProject.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS charityproject_fts').execute_if(dialect='sqlite')
+)
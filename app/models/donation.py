@@ -1,10 +1,26 @@
-from sqlalchemy import Text, ForeignKey, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import CheckConstraint, Index, Text, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
-from .base import BaseModel
+from .base import BaseModel, list_indexes, open_queue_index
 
 
 class Donation(BaseModel):
     user_id: Mapped[int] = mapped_column(Integer,
                                          ForeignKey('user.id'))
     comment: Mapped[str] = mapped_column(Text, nullable=True)
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            CheckConstraint(
+                'full_amount > 0', name='check_full_amount_positive'
+            ),
+            open_queue_index(cls.__tablename__),
+            *list_indexes(cls.__tablename__),
+            Index(
+                'ix_donation_user_id_create_date',
+                'user_id',
+                'create_date',
+                'id',
+            ),
+        )
@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class DonationSummary(Base):
+    """
+    Итоги пожертвований пользователя.
+
+    Строка обновляется при создании пожертвований и при распределении
+    (см. app.crud.donation_summary), поэтому итоги не пересчитываются
+    по таблице пожертвований при каждом запросе.
+    """
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('user.id'),
+        unique=True,
+        nullable=False
+    )
+    donations_count: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    full_amount: Mapped[int] = mapped_column(
+        BigInteger, default=0, nullable=False
+    )
+    invested_amount: Mapped[int] = mapped_column(
+        BigInteger, default=0, nullable=False
+    )
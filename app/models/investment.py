@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+from app.models.base import utc_now
+
+
+class Investment(Base):
+    """
+    Запись журнала распределения: сумма, переведенная из пожертвования
+    в проект за один проход распределения.
+    """
+    donation_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('donation.id'),
+        index=True,
+        nullable=False
+    )
+    project_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('charityproject.id'),
+        index=True,
+        nullable=False
+    )
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utc_now,
+        nullable=False
+    )
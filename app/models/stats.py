@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class Stats(Base):
+    """
+    Общая статистика фонда.
+
+    Таблица из одной строки (id = 1). Счетчики изменяются на разницу в тех
+    же транзакциях, что и данные (см. app.crud.stats), поэтому для чтения
+    статистики не нужны агрегаты по таблицам.
+    """
+    donated_amount: Mapped[int] = mapped_column(
+        BigInteger, default=0, nullable=False
+    )
+    invested_amount: Mapped[int] = mapped_column(
+        BigInteger, default=0, nullable=False
+    )
+    open_projects: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    closed_projects: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    donors_count: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
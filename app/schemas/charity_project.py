@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field, PositiveInt
 
+MAX_SIMULATED_DONATIONS = 100000
+
 
 class CharityProjectBase(BaseModel):
     """
@@ -66,3 +68,56 @@ class CharityProjectDB(CharityProjectCreate):
     close_date: datetime | None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CharityProjectSimulationCreate(BaseModel):
+    """
+    Схема запроса на прогноз распределения.
+
+    Attributes:
+        donations (list[PositiveInt]): Суммы ожидаемых пожертвований в порядке
+        поступления, не более MAX_SIMULATED_DONATIONS.
+        model_config (ConfigDict): Конфигурация модели для запрета
+        дополнительных полей при валидации.
+    """
+    donations: list[PositiveInt] = Field(
+        ..., min_length=1, max_length=MAX_SIMULATED_DONATIONS
+    )
+
+    model_config = ConfigDict(extra='forbid')
+
+
+class CharityProjectForecast(BaseModel):
+    """
+    Прогноз по открытому проекту.
+
+    Attributes:
+        id (int): Идентификатор проекта.
+        name (str): Имя проекта.
+        full_amount (int): Требуемая сумма.
+        invested_amount (int): Сумма, которая будет вложена в проект.
+        fully_invested (bool): Будет ли проект закрыт.
+        closing_donation (int or None): Индекс ожидаемого пожертвования,
+        которым закроется проект. None, если проект не закроется или его
+        закроют уже поступившие открытые пожертвования: такое возможно,
+        пока фоновый проход инвестирования еще не распределил их.
+    """
+    id: int
+    name: str
+    full_amount: int
+    invested_amount: int
+    fully_invested: bool
+    closing_donation: int | None
+
+
+class CharityProjectSimulation(BaseModel):
+    """
+    Результат прогноза распределения.
+
+    Attributes:
+        projects (list[CharityProjectForecast]): Прогноз по открытым проектам.
+        idle_amount (int): Сумма ожидаемых пожертвований, которая останется
+        нераспределенной.
+    """
+    projects: list[CharityProjectForecast]
+    idle_amount: int
@@ -62,3 +62,42 @@ class DonationDB(DonationDBShort):
     close_date: datetime | None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class DonationBulkResult(BaseModel):
+    """
+    Результат создания пожертвования в пачке.
+
+    Attributes:
+        id (int): Идентификатор пожертвования.
+        full_amount (int): Сумма пожертвования.
+        invested_amount (int): Сумма, распределенная по проектам.
+        fully_invested (bool): Флаг, указывающий, полностью ли распределено
+        пожертвование.
+        model_config (ConfigDict): Конфигурация схемы для сериализации объектов
+        базы данных.
+    """
+    id: int
+    full_amount: int
+    invested_amount: int
+    fully_invested: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DonationSummaryDB(BaseModel):
+    """
+    Итоги пожертвований пользователя.
+
+    Attributes:
+        donations_count (int): Число пожертвований.
+        full_amount (int): Общая сумма пожертвований.
+        invested_amount (int): Сумма, распределенная по проектам.
+        model_config (ConfigDict): Конфигурация схемы для сериализации объектов
+        базы данных.
+    """
+    donations_count: int
+    full_amount: int
+    invested_amount: int
+
+    model_config = ConfigDict(from_attributes=True)
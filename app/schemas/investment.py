@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class InvestmentDB(BaseModel):
+    """
+    Схема записи журнала распределения.
+
+    Attributes:
+        id (int): Идентификатор записи.
+        donation_id (int): Идентификатор пожертвования.
+        project_id (int): Идентификатор проекта.
+        amount (int): Переведенная сумма.
+        created_at (datetime): Время распределения (UTC).
+        model_config (ConfigDict): Конфигурация схемы для сериализации объектов
+        базы данных.
+    """
+    id: int
+    donation_id: int
+    project_id: int
+    amount: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class StatsDB(BaseModel):
+    """
+    Схема общей статистики фонда.
+
+    Attributes:
+        donated_amount (int): Сумма всех пожертвований.
+        invested_amount (int): Сумма, распределенная по проектам.
+        open_projects (int): Число открытых проектов.
+        closed_projects (int): Число закрытых проектов.
+        donors_count (int): Число пользователей, сделавших пожертвования.
+        model_config (ConfigDict): Конфигурация схемы для сериализации объектов
+        базы данных.
+    """
+    donated_amount: int
+    invested_amount: int
+    open_projects: int
+    closed_projects: int
+    donors_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CacheStats(BaseModel):
+    """
+    Схема счетчиков кэша.
+
+    Attributes:
+        hits (int): Число попаданий.
+        misses (int): Число промахов.
+        size (int): Текущее число записей.
+    """
+    hits: int
+    misses: int
+    size: int
+
+
+class PasswordPoolStats(BaseModel):
+    """
+    Схема счетчиков пула хеширования паролей.
+
+    Attributes:
+        workers (int): Число потоков пула.
+        in_flight (int): Число выполняющихся и ожидающих расчетов.
+        queue_depth (int): Число расчетов, ожидающих свободного потока.
+        max_queue_depth (int): Наибольшая длина очереди.
+    """
+    workers: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
@@ -0,0 +1,49 @@
+from collections.abc import AsyncIterator
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+
+
+# Сколько строк читать из базы и отдавать клиенту за одну порцию выгрузки.
+EXPORT_CHUNK_SIZE = 1000
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+async def export_ndjson(
+    crud: CRUDBase,
+    schema: type[BaseModel],
+    session: AsyncSession,
+) -> AsyncIterator[bytes]:
+    """
+    Выгружает все объекты модели в формате NDJSON.
+
+    Строки читаются потоком (см. CRUDBase.stream_multi), каждая
+    сериализуется схемой в одну JSON-строку, а клиенту отправляется по одной
+    порции на EXPORT_CHUNK_SIZE строк.
+
+    Тело StreamingResponse отправляется уже после выхода из зависимостей
+    эндпоинта, поэтому поток заново открывает соединение в переданной сессии
+    и сам закрывает ее по завершении выгрузки.
+
+    Args:
+        crud (CRUDBase): CRUD-объект выгружаемой модели.
+        schema (type[BaseModel]): Схема сериализации строки.
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Yields:
+        bytes: Порция строк NDJSON.
+    """
+    try:
+        rows = await crud.stream_multi(session, EXPORT_CHUNK_SIZE)
+        async for partition in rows.partitions():
+            yield b''.join(
+                schema.model_validate(row).model_dump_json(
+                    exclude_none=True
+                ).encode() + b'\n'
+                for row in partition
+            )
+    finally:
+        await session.close()
@@ -1,29 +1,229 @@
-from datetime import datetime, timezone
+import asyncio
+from collections.abc import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import event, false, func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models import CharityProject, Donation
+from app.core.cache import charity_project_cache
+from app.core.config import settings
+from app.crud.donation_summary import donation_summary_crud
+from app.crud.stats import stats_crud
+from app.models import CharityProject, Donation, Investment
+from app.models.base import utc_now
+from app.services.sql_investment import sql_investment
 
 
-async def investment(session: AsyncSession) -> None:
+# Сколько строк противоположной стороны подгружать за одну выборку
+# при инкрементальном распределении.
+STREAM_CHUNK_SIZE = 100
+
+# Ключ advisory-блокировки распределения в PostgreSQL.
+INVESTMENT_LOCK_ID = 0x0c4a7173
+# Блокировка распределения внутри процесса для остальных СУБД.
+local_investment_lock = asyncio.Lock()
+
+
+async def lock_investment(session: AsyncSession) -> None:
     """
-    Функция распределения инвестиций.
+    Захватывает блокировку распределения до конца транзакции сессии.
+
+    В PostgreSQL используется pg_advisory_xact_lock, поэтому распределение
+    безопасно выполнять из нескольких процессов. В остальных СУБД (SQLite)
+    берется блокировка процесса, которая освобождается при завершении
+    транзакции. Повторный вызов в той же транзакции ничего не делает.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
     """
-    projects_result = await session.execute(
-        select(CharityProject).where(
-            CharityProject.fully_invested.is_(False)
-        ).order_by(CharityProject.create_date)
+    if 'investment_unlock' in session.info:
+        return
+    if session.get_bind().dialect.name == 'postgresql':
+        await session.execute(
+            select(func.pg_advisory_xact_lock(INVESTMENT_LOCK_ID))
+        )
+        session.info['investment_unlock'] = None
+        return
+    await local_investment_lock.acquire()
+    try:
+        await session.connection()
+    except BaseException:
+        local_investment_lock.release()
+        raise
+    session.info['investment_unlock'] = local_investment_lock.release
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def unlock_investment(session: Session, transaction) -> None:
+    """
+    Освобождает блокировку распределения по завершении транзакции.
+    """
+    if transaction.parent is None and 'investment_unlock' in session.info:
+        unlock = session.info.pop('investment_unlock')
+        if unlock is not None:
+            unlock()
+
+
+def close_if_invested(obj: CharityProject | Donation) -> bool:
+    """
+    Закрывает проект или пожертвование, если сумма вложена полностью.
+
+    Args:
+        obj (CharityProject or Donation): Проверяемый объект.
+
+    Returns:
+        bool: True, если объект закрыт.
+    """
+    if obj.invested_amount != obj.full_amount:
+        return False
+    obj.fully_invested = True
+    obj.close_date = utc_now()
+    return True
+
+
+def invest(
+    project: CharityProject,
+    donation: Donation,
+    allocations: list[dict],
+) -> None:
+    """
+    Переводит из пожертвования в проект максимально возможную сумму.
+
+    Args:
+        project (CharityProject): Открытый проект.
+        donation (Donation): Открытое пожертвование.
+        allocations (list[dict]): Записи журнала распределения текущего
+                                  прохода, в которые добавляется перевод.
+    """
+    amount_to_invest = min(
+        project.full_amount - project.invested_amount,
+        donation.full_amount - donation.invested_amount
     )
-    projects = projects_result.scalars().all()
+    if amount_to_invest <= 0:
+        return
+    project.invested_amount += amount_to_invest
+    donation.invested_amount += amount_to_invest
+    allocations.append({
+        'donation_id': donation.id,
+        'project_id': project.id,
+        'amount': amount_to_invest,
+    })
 
-    donations_result = await session.execute(
-        select(Donation).where(
-            Donation.fully_invested.is_(False)
-        ).order_by(Donation.create_date)
+
+def open_objects(model: type[CharityProject] | type[Donation]):
+    """
+    Запрос открытых объектов модели в порядке очереди (FIFO).
+    """
+    return select(model).where(
+        model.fully_invested == false()
+    ).order_by(model.create_date, model.id)
+
+
+class QueueItem:
+    """
+    Облегченная строка очереди распределения.
+
+    Хранит только поля, нужные для расчета, и не регистрируется в сессии,
+    поэтому подходит для распределения по большим очередям.
+    """
+    __slots__ = (
+        'id', 'full_amount', 'invested_amount', 'fully_invested', 'close_date'
     )
-    donations = donations_result.scalars().all()
 
+    def __init__(self, id: int, full_amount: int, invested_amount: int):
+        self.id = id
+        self.full_amount = full_amount
+        self.invested_amount = invested_amount
+        self.fully_invested = False
+        self.close_date = None
+
+
+def open_items(model: type[CharityProject] | type[Donation]):
+    """
+    Запрос строк (id, full_amount, invested_amount) открытых объектов модели
+    в порядке очереди (FIFO).
+    """
+    return select(
+        model.id, model.full_amount, model.invested_amount
+    ).where(
+        model.fully_invested == false()
+    ).order_by(model.create_date, model.id)
+
+
+async def investment(
+    session: AsyncSession,
+    target: CharityProject | Donation | None = None,
+) -> None:
+    """
+    Функция распределения инвестиций.
+
+    Без target выполняется полный проход по всем открытым проектам и
+    пожертвованиям. Если передан только что созданный объект, он
+    сопоставляется лишь со старейшими открытыми объектами другой стороны:
+    после каждого прохода открытыми могут оставаться объекты только одной
+    стороны, поэтому новому объекту больше не с чем пересекаться.
+
+    Движок выбирается настройкой settings.investment_engine: 'orm' -
+    распределение по ORM-объектам, 'rows' - по облегченным строкам
+    (см. row_investment), 'sql' - всегда полный проход на стороне базы
+    данных (см. app.services.sql_investment).
+
+    Чтение открытых объектов и запись результата выполняются под
+    блокировкой распределения (см. lock_investment). Все переводы прохода
+    записываются в журнал Investment одной массовой вставкой, а вложенные
+    суммы добавляются к итогам пожертвований пользователей и к общей
+    статистике (app.crud.stats). Изменения
+    только отправляются в базу, зафиксировать их должен вызывающий код
+    (в эндпоинтах - app.core.db.get_unit_of_work); если проход что-то
+    распределил, после коммита сбрасывается кэш списка проектов.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        target (CharityProject or Donation or None): Новый объект для
+                                                     инкрементального прохода.
+    """
+    await lock_investment(session)
+    if settings.investment_engine == 'sql':
+        invested = await sql_investment(session)
+        if target is not None:
+            # UPDATE на стороне базы не меняет объекты в сессии.
+            await session.refresh(target)
+    else:
+        if settings.investment_engine == 'rows':
+            allocations = await row_investment(session, target)
+        elif target is None:
+            allocations = await full_investment(session)
+        else:
+            allocations = await incremental_investment(target, session)
+        if allocations:
+            await session.execute(insert(Investment), allocations)
+            await donation_summary_crud.add_invested(session, allocations)
+        await session.flush()
+        # Закрытые за проход проекты считаются по уже записанным строкам.
+        await stats_crud.add_invested(session, allocations)
+        invested = bool(allocations)
+    if invested:
+        charity_project_cache.invalidate_on_commit(session)
+
+
+def allocate(
+    projects: list[CharityProject],
+    donations: list[Donation],
+) -> list[dict]:
+    """
+    Распределяет пожертвования по проектам в порядке очереди (FIFO).
+
+    Изменяет переданные объекты и не обращается к базе данных.
+
+    Args:
+        projects (list[CharityProject]): Открытые проекты в порядке очереди.
+        donations (list[Donation]): Открытые пожертвования в порядке очереди.
+
+    Returns:
+        list[dict]: Записи журнала распределения.
+    """
+    allocations = []
     project_index = 0
     donation_index = 0
 
@@ -31,34 +231,151 @@ async def investment(session: AsyncSession) -> None:
         project = projects[project_index]
         donation = donations[donation_index]
 
-        available_project_amount = (
-            project.full_amount - project.invested_amount
-        )
-        available_donation_amount = (
-            donation.full_amount - donation.invested_amount
-        )
+        invest(project, donation, allocations)
 
-        amount_to_invest = min(available_project_amount,
-                               available_donation_amount)
+        if close_if_invested(project):
+            project_index += 1
+        if close_if_invested(donation):
+            donation_index += 1
+    return allocations
 
-        project.invested_amount += amount_to_invest
-        donation.invested_amount += amount_to_invest
 
-        if project.invested_amount == project.full_amount:
-            project.fully_invested = True
-            project.close_date = datetime.now(timezone.utc)
-            project_index += 1
+async def full_investment(session: AsyncSession) -> list[dict]:
+    """
+    Распределяет все открытые пожертвования по всем открытым проектам.
 
-        if donation.invested_amount == donation.full_amount:
-            donation.fully_invested = True
-            donation.close_date = datetime.now(timezone.utc)
-            donation_index += 1
+    Returns:
+        list[dict]: Записи журнала распределения.
+    """
+    projects_result = await session.execute(open_objects(CharityProject))
+    projects = projects_result.scalars().all()
 
-        if available_project_amount == 0:
-            project_index += 1
-        elif available_donation_amount == 0:
-            donation_index += 1
+    donations_result = await session.execute(open_objects(Donation))
+    donations = donations_result.scalars().all()
+
+    return allocate(projects, donations)
+
+
+async def fill_target(
+    target: CharityProject | Donation | QueueItem,
+    sources: AsyncIterator,
+    target_is_project: bool,
+) -> list[dict]:
+    """
+    Распределяет средства нового объекта по объектам другой стороны, пока
+    новый объект не будет исчерпан.
+
+    Args:
+        target (CharityProject or Donation or QueueItem): Новый объект.
+        sources (AsyncIterator): Открытые объекты другой стороны в порядке
+                                 очереди.
+        target_is_project (bool): Является ли новый объект проектом.
+
+    Returns:
+        list[dict]: Записи журнала распределения.
+    """
+    allocations = []
+    async for source in sources:
+        if target_is_project:
+            invest(target, source, allocations)
         else:
-            continue
+            invest(source, target, allocations)
+        close_if_invested(source)
+        if close_if_invested(target):
+            break
+    return allocations
+
+
+async def incremental_investment(
+    target: CharityProject | Donation,
+    session: AsyncSession,
+) -> list[dict]:
+    """
+    Распределяет средства нового объекта по открытым объектам другой стороны.
+
+    Объекты другой стороны читаются потоком в порядке create_date и
+    выборка прекращается, как только новый объект исчерпан.
+
+    Returns:
+        list[dict]: Записи журнала распределения.
+    """
+    target_is_project = isinstance(target, CharityProject)
+    sources = await session.stream_scalars(
+        open_objects(
+            Donation if target_is_project else CharityProject
+        ).execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    allocations = await fill_target(target, sources, target_is_project)
+    await sources.close()
+    return allocations
 
-    await session.commit()
+
+async def row_investment(
+    session: AsyncSession,
+    target: CharityProject | Donation | None = None,
+) -> list[dict]:
+    """
+    Распределение по облегченным строкам без загрузки ORM-объектов.
+
+    Из базы читаются только (id, full_amount, invested_amount) открытых
+    объектов, а измененные строки записываются обратно одним executemany
+    UPDATE на таблицу. Порядок и результат распределения те же, что у
+    full_investment и incremental_investment. Итог распределения копируется
+    в target без пометки об изменении.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        target (CharityProject or Donation or None): Новый объект для
+                                                     инкрементального прохода.
+
+    Returns:
+        list[dict]: Записи журнала распределения.
+    """
+    if target is None:
+        queues = {}
+        for model in (CharityProject, Donation):
+            rows = await session.execute(open_items(model))
+            queues[model] = [QueueItem(*row) for row in rows]
+        allocations = allocate(queues[CharityProject], queues[Donation])
+    else:
+        target_is_project = isinstance(target, CharityProject)
+        source_model = Donation if target_is_project else CharityProject
+        target_item = QueueItem(
+            target.id, target.full_amount, target.invested_amount
+        )
+        queues = {type(target): [target_item], source_model: []}
+        rows = await session.stream(
+            open_items(source_model).execution_options(
+                yield_per=STREAM_CHUNK_SIZE
+            )
+        )
+
+        async def source_items():
+            async for row in rows:
+                item = QueueItem(*row)
+                queues[source_model].append(item)
+                yield item
+
+        allocations = await fill_target(
+            target_item, source_items(), target_is_project
+        )
+        await rows.close()
+        for field in ('invested_amount', 'fully_invested', 'close_date'):
+            set_committed_value(target, field, getattr(target_item, field))
+    for model, id_key in (
+        (CharityProject, 'project_id'),
+        (Donation, 'donation_id'),
+    ):
+        changed_ids = {allocation[id_key] for allocation in allocations}
+        changes = [
+            {
+                'id': item.id,
+                'invested_amount': item.invested_amount,
+                'fully_invested': item.fully_invested,
+                'close_date': item.close_date,
+            }
+            for item in queues[model] if item.id in changed_ids
+        ]
+        if changes:
+            await session.execute(update(model), changes)
+    return allocations
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models import CharityProject, Donation
+from app.services.investment import investment
+
+
+# Пауза перед повтором неудавшегося прохода удваивается от
+# RETRY_DELAY_MIN до RETRY_DELAY_MAX секунд.
+RETRY_DELAY_MIN = 0.1
+RETRY_DELAY_MAX = 30
+
+logger = logging.getLogger(__name__)
+
+
+class InvestmentScheduler:
+    """
+    Фоновый планировщик, объединяющий запросы на распределение инвестиций.
+
+    Эндпоинты создания только отмечают, что распределение нужно, а одна
+    фоновая задача выполняет полный проход не чаще раза в окно батчинга
+    или сразу после накопления max_batch_size запросов. Если проход
+    завершился ошибкой, его запросы возвращаются в очередь и проход
+    повторяется с нарастающей паузой.
+
+    Attributes:
+        session_factory (async_sessionmaker): Фабрика сессий для проходов.
+        window (float): Окно батчинга в секундах.
+        max_batch_size (int): Число запросов, после которого проход
+                              запускается, не дожидаясь конца окна.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        window: float,
+        max_batch_size: int,
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._task: asyncio.Task | None = None
+        self._pending = 0
+        self._retry_delay = 0
+        self._waiters: list[asyncio.Future] = []
+        self._requested = asyncio.Event()
+        self._batch_full = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        """
+        Запущен ли планировщик.
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Запускает фоновую задачу в текущем цикле событий.
+        """
+        if not self.running:
+            self._requested.clear()
+            self._batch_full.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу, выполнив последний проход для
+        накопившихся запросов.
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._pending:
+            await self._run_pass()
+
+    def request(self) -> None:
+        """
+        Отмечает, что требуется распределение инвестиций.
+        """
+        self._pending += 1
+        self._requested.set()
+        if self._pending >= self.max_batch_size:
+            self._batch_full.set()
+
+    def next_pass(self) -> asyncio.Future:
+        """
+        Возвращает future, которое завершается после следующего выполненного
+        прохода.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    async def _run(self) -> None:
+        while True:
+            await self._requested.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._requested.clear()
+            self._batch_full.clear()
+            if await self._run_pass():
+                self._retry_delay = 0
+            else:
+                self._retry_delay = min(
+                    max(self._retry_delay * 2, RETRY_DELAY_MIN),
+                    RETRY_DELAY_MAX
+                )
+                await asyncio.sleep(self._retry_delay)
+
+    async def _run_pass(self) -> bool:
+        waiters, self._waiters = self._waiters, []
+        pending, self._pending = self._pending, 0
+        try:
+            async with self.session_factory() as session:
+                await investment(session)
+                await session.commit()
+        except asyncio.CancelledError:
+            # Прерванный проход будет повторен при остановке планировщика.
+            self._waiters[:0] = waiters
+            self._pending += pending or 1
+            raise
+        except Exception as error:
+            logger.exception('Проход распределения инвестиций не удался')
+            # Новые объекты уже зафиксированы, поэтому проход повторяется.
+            self._pending += pending or 1
+            self._requested.set()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(error)
+            return False
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        return True
+
+
+investment_scheduler = InvestmentScheduler(
+    AsyncSessionLocal,
+    window=settings.investment_batch_window_ms / 1000,
+    max_batch_size=settings.investment_batch_max_size,
+)
+
+
+async def run_investment(
+    session: AsyncSession,
+    target: CharityProject | Donation | None = None,
+    wait: bool = True,
+) -> None:
+    """
+    Распределяет инвестиции сразу или через фоновый планировщик.
+
+    Без планировщика проход выполняется в транзакции сессии и
+    фиксируется вместе с ней. Если планировщик запущен, распределение
+    только запрашивается: запрос передается планировщику после коммита
+    транзакции сессии (см. request_investment_on_commit), чтобы фоновый
+    проход увидел новые объекты. Транзакцией по-прежнему управляет
+    вызывающий код; дождаться прохода после коммита можно через
+    commit_and_wait.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        target (CharityProject or Donation or None): Новый объект для
+                                                     инкрементального прохода.
+        wait (bool, default = True): Перечитать ли target в commit_and_wait
+                                     после прохода.
+    """
+    if not investment_scheduler.running:
+        await investment(session, target)
+        return
+    session.info['investment_requested'] = True
+    if wait and target is not None:
+        wait_for_investment(session, target)
+
+
+def wait_for_investment(
+    session: AsyncSession,
+    *targets: CharityProject | Donation,
+) -> None:
+    """
+    Отмечает объекты, которые commit_and_wait перечитает после
+    запрошенного в сессии прохода распределения.
+
+    Без запущенного планировщика проход уже выполнен в транзакции
+    сессии, и отмечать ничего не нужно.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        *targets (CharityProject or Donation): Объекты для перечитывания.
+    """
+    if not investment_scheduler.running:
+        return
+    session.info.setdefault('investment_targets', []).extend(targets)
+
+
+@event.listens_for(Session, 'after_commit')
+def request_investment_on_commit(session: Session) -> None:
+    """
+    Передает планировщику запрос распределения, сделанный в
+    зафиксированной транзакции.
+    """
+    if not session.info.pop('investment_requested', False):
+        return
+    investment_scheduler.request()
+    if session.info.get('investment_targets'):
+        session.info['investment_pass'] = investment_scheduler.next_pass()
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_investment_request(session: Session) -> None:
+    """
+    Отменяет запрос распределения откатившейся транзакции.
+    """
+    session.info.pop('investment_requested', None)
+    session.info.pop('investment_targets', None)
+
+
+async def commit_and_wait(session: AsyncSession) -> None:
+    """
+    Фиксирует транзакцию запроса и дожидается запрошенного в ней прохода
+    распределения.
+
+    Объекты, переданные в run_investment с wait=True, перечитываются
+    после прохода. Если проход завершился ошибкой, объекты остаются
+    зафиксированными с еще не распределенными суммами, а планировщик
+    повторит проход сам.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+    """
+    await session.commit()
+    waiter = session.info.pop('investment_pass', None)
+    targets = session.info.pop('investment_targets', [])
+    if waiter is None:
+        return
+    try:
+        await waiter
+    except Exception:
+        return
+    for target in targets:
+        await session.refresh(target)
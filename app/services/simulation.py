@@ -0,0 +1,95 @@
+import numpy as np
+
+
+def simulate_investment(
+    project_amounts,
+    donation_amounts,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Рассчитывает распределение инвестиций в памяти, ничего не записывая.
+
+    Результат совпадает с app.services.investment.allocate, но вместо цикла
+    по парам используются нарастающие итоги: проект или пожертвование
+    занимает в своей очереди интервал (end - amount, end], и в него
+    вкладывается его пересечение с отрезком (0, total], где total - меньшая
+    из сумм двух очередей.
+
+    Args:
+        project_amounts: Остатки открытых проектов в порядке очереди.
+        donation_amounts: Остатки открытых пожертвований в порядке очереди.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Суммы, вложенные в каждый
+        проект и из каждого пожертвования, и индекс пожертвования, которым
+        закрывается каждый проект (-1, если проект остается открытым).
+    """
+    projects = np.asarray(project_amounts, dtype=np.int64)
+    donations = np.asarray(donation_amounts, dtype=np.int64)
+    project_ends = np.cumsum(projects)
+    donation_ends = np.cumsum(donations)
+    total = min(
+        project_ends[-1] if projects.size else 0,
+        donation_ends[-1] if donations.size else 0,
+    )
+    project_invested = np.clip(total - project_ends + projects, 0, projects)
+    donation_invested = np.clip(
+        total - donation_ends + donations, 0, donations
+    )
+    closing_donations = np.searchsorted(
+        donation_ends, project_ends, side='left'
+    )
+    closing_donations[project_ends > total] = -1
+    return project_invested, donation_invested, closing_donations
+
+
+def forecast_projects(
+    projects: list,
+    open_donation_amounts: list[int],
+    pledged_amounts: list[int],
+) -> tuple[list[dict], int]:
+    """
+    Прогноз по открытым проектам при поступлении ожидаемых пожертвований.
+
+    Ожидаемые пожертвования становятся в очередь после уже открытых.
+    Проекты, которые закроют уже открытые пожертвования, получают
+    closing_donation = None, как и незакрытые: индекс указывает только на
+    ожидаемые пожертвования.
+
+    Args:
+        projects (list): Открытые проекты в порядке очереди (строки с полями
+                         id, name, full_amount и invested_amount).
+        open_donation_amounts (list[int]): Остатки открытых пожертвований.
+        pledged_amounts (list[int]): Суммы ожидаемых пожертвований.
+
+    Returns:
+        tuple[list[dict], int]: Прогноз по каждому проекту и сумма ожидаемых
+        пожертвований, которая останется нераспределенной.
+    """
+    remaining = [
+        project.full_amount - project.invested_amount for project in projects
+    ]
+    donations = list(open_donation_amounts) + list(pledged_amounts)
+    project_invested, donation_invested, closing_donations = (
+        simulate_investment(remaining, donations)
+    )
+    forecast = []
+    for project, invested, closing_donation in zip(
+        projects, project_invested.tolist(), closing_donations.tolist()
+    ):
+        closing_donation -= len(open_donation_amounts)
+        forecast.append({
+            'id': project.id,
+            'name': project.name,
+            'full_amount': project.full_amount,
+            'invested_amount': project.invested_amount + invested,
+            'fully_invested': (
+                project.invested_amount + invested == project.full_amount
+            ),
+            'closing_donation': (
+                closing_donation if closing_donation >= 0 else None
+            ),
+        })
+    idle_amount = sum(pledged_amounts) - int(
+        donation_invested[len(open_donation_amounts):].sum()
+    )
+    return forecast, idle_amount
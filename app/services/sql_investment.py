@@ -0,0 +1,208 @@
+from datetime import datetime
+
+from sqlalchemy import (and_, case, false, func, insert, literal, select,
+                        update)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.stats import stats_crud
+from app.models import CharityProject, Donation, DonationSummary, Investment
+from app.models.base import utc_now
+
+
+def running_totals(model: type[CharityProject] | type[Donation]):
+    """
+    Подзапрос открытых объектов с нарастающим итогом остатков.
+
+    Каждый объект занимает в очереди интервал (hi - remaining, hi], где hi -
+    сумма остатков всех объектов до него включительно (FIFO по create_date).
+
+    Args:
+        model (type[CharityProject] or type[Donation]): Модель.
+
+    Returns:
+        Subquery: Подзапрос с колонками id, remaining и hi.
+    """
+    remaining = model.full_amount - model.invested_amount
+    return select(
+        model.id,
+        remaining.label('remaining'),
+        func.sum(remaining).over(
+            order_by=(model.create_date, model.id)
+        ).label('hi'),
+    ).where(
+        model.fully_invested == false()
+    ).subquery()
+
+
+async def matched_total(session: AsyncSession) -> int:
+    """
+    Сумма, которая будет распределена за проход.
+
+    Это меньшая из сумм остатков открытых проектов и открытых пожертвований.
+    """
+    totals = {}
+    for model in (CharityProject, Donation):
+        totals[model] = select(
+            func.coalesce(
+                func.sum(model.full_amount - model.invested_amount), 0
+            )
+        ).where(model.fully_invested == false()).scalar_subquery()
+    result = await session.execute(select(*totals.values()))
+    return min(result.one())
+
+
+def allocation_shares(
+        model: type[CharityProject] | type[Donation],
+        total: int,
+):
+    """
+    Подзапрос сумм, вложенных за проход в открытые объекты модели.
+
+    Интервал объекта в очереди пересекается с отрезком (0, total]; длина
+    пересечения и есть сумма, вложенная в объект за проход.
+
+    Returns:
+        Subquery: Подзапрос с колонками id и share.
+    """
+    totals = running_totals(model)
+    lower_bound = totals.c.hi - totals.c.remaining
+    return select(
+        totals.c.id,
+        case(
+            (totals.c.hi <= total, totals.c.remaining),
+            else_=total - lower_bound,
+        ).label('share'),
+    ).where(lower_bound < total).subquery()
+
+
+def allocation_update(
+        model: type[CharityProject] | type[Donation],
+        total: int,
+        close_date: datetime,
+):
+    """
+    Один UPDATE ... FROM, распределяющий total по открытым объектам модели.
+    """
+    shares = allocation_shares(model, total)
+    new_invested_amount = model.invested_amount + shares.c.share
+    return update(model).where(
+        model.id == shares.c.id
+    ).values(
+        invested_amount=new_invested_amount,
+        fully_invested=new_invested_amount == model.full_amount,
+        close_date=case(
+            (
+                new_invested_amount == model.full_amount,
+                literal(close_date, model.close_date.type)
+            ),
+            else_=model.close_date,
+        ),
+    ).execution_options(synchronize_session=False)
+
+
+def summary_update(total: int):
+    """
+    UPDATE ... FROM, добавляющий вложенные за проход суммы к итогам
+    пожертвований пользователей (см. app.models.DonationSummary).
+
+    Должен выполняться до allocation_update пожертвований: доли
+    считаются по еще не обновленным остаткам.
+    """
+    shares = allocation_shares(Donation, total)
+    invested = select(
+        Donation.user_id,
+        func.sum(shares.c.share).label('amount'),
+    ).join(
+        shares, Donation.id == shares.c.id
+    ).group_by(Donation.user_id).subquery()
+    return update(DonationSummary).where(
+        DonationSummary.user_id == invested.c.user_id
+    ).values(
+        invested_amount=DonationSummary.invested_amount + invested.c.amount
+    ).execution_options(synchronize_session=False)
+
+
+def closed_projects_count(total: int):
+    """
+    Скалярный подзапрос числа проектов, которые закроются за проход:
+    их интервалы в очереди целиком лежат в отрезке (0, total].
+    """
+    totals = running_totals(CharityProject)
+    return select(func.count()).select_from(totals).where(
+        totals.c.hi <= total
+    ).scalar_subquery()
+
+
+def allocations_insert(total: int, created_at: datetime):
+    """
+    INSERT ... SELECT записей журнала распределения.
+
+    Пожертвование переводит средства в проект, если их интервалы в очередях
+    пересекаются; длина пересечения - переведенная сумма. Рассматриваются
+    только объекты, интервалы которых начинаются раньше total.
+    """
+    projects = running_totals(CharityProject)
+    donations = running_totals(Donation)
+    project_start = projects.c.hi - projects.c.remaining
+    donation_start = donations.c.hi - donations.c.remaining
+    allocation_start = case(
+        (project_start > donation_start, project_start),
+        else_=donation_start,
+    )
+    allocation_end = case(
+        (projects.c.hi < donations.c.hi, projects.c.hi),
+        else_=donations.c.hi,
+    )
+    allocations = select(
+        donations.c.id,
+        projects.c.id,
+        allocation_end - allocation_start,
+        literal(created_at, Investment.created_at.type),
+    ).select_from(
+        projects.join(
+            donations,
+            and_(
+                project_start < donations.c.hi,
+                donation_start < projects.c.hi,
+            )
+        )
+    ).where(
+        project_start < total,
+        donation_start < total,
+    ).order_by(allocation_start)
+    return insert(Investment).from_select(
+        ['donation_id', 'project_id', 'amount', 'created_at'],
+        allocations
+    )
+
+
+async def sql_investment(session: AsyncSession) -> int:
+    """
+    Распределение инвестиций средствами базы данных.
+
+    Дает тот же результат, что и цикл в app.services.investment, но
+    выполняется одним запросом на чтение, одним INSERT ... SELECT в журнал
+    распределения и одним UPDATE на каждую таблицу, включая итоги
+    пожертвований пользователей и общую статистику.
+    Требует оконных функций и UPDATE ... FROM (SQLite 3.33+, PostgreSQL).
+
+    Returns:
+        int: Сумма, распределенная за проход.
+    """
+    total = await matched_total(session)
+    if not total:
+        return total
+    # Записи журнала и даты закрытия получают одно и то же время прохода.
+    now = utc_now()
+    await session.execute(allocations_insert(total, now))
+    await session.execute(summary_update(total))
+    closed_projects = closed_projects_count(total)
+    await stats_crud.add(
+        session,
+        invested_amount=total,
+        open_projects=-closed_projects,
+        closed_projects=closed_projects,
+    )
+    for model in (CharityProject, Donation):
+        await session.execute(allocation_update(model, total, now))
+    return total
@@ -0,0 +1,78 @@
+"""
+Пересчет общей статистики фонда.
+
+Счетчики таблицы Stats поддерживаются изменениями на разницу; команда
+пересчитывает их заново по таблицам проектов и пожертвований, например
+после ручной правки данных или восстановления из резервной копии.
+
+Запуск из корня проекта (нужен .env, как для приложения):
+
+    python -m app.services.stats
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.crud.stats import stats_crud
+from app.models import CharityProject, Donation
+from app.services.investment import lock_investment
+
+
+# Сколько строк подгружать за одну выборку при пересчете.
+RECONCILE_CHUNK_SIZE = 1000
+
+
+async def reconcile_stats(session: AsyncSession) -> dict[str, int]:
+    """
+    Пересчитывает статистику за один потоковый проход по таблицам.
+
+    Пересчет выполняется под блокировкой распределения, поэтому
+    пожертвования и проходы распределения не меняют данные между чтением
+    и записью счетчиков. Транзакция не фиксируется.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        dict[str, int]: Пересчитанные счетчики.
+    """
+    await lock_investment(session)
+    counters = dict.fromkeys(stats_crud.counters(), 0)
+    projects = await session.stream_scalars(
+        select(CharityProject.fully_invested).execution_options(
+            yield_per=RECONCILE_CHUNK_SIZE
+        )
+    )
+    async for fully_invested in projects:
+        if fully_invested:
+            counters['closed_projects'] += 1
+        else:
+            counters['open_projects'] += 1
+    donors = set()
+    donations = await session.stream(
+        select(
+            Donation.user_id, Donation.full_amount, Donation.invested_amount
+        ).execution_options(yield_per=RECONCILE_CHUNK_SIZE)
+    )
+    async for user_id, full_amount, invested_amount in donations:
+        counters['donated_amount'] += full_amount
+        counters['invested_amount'] += invested_amount
+        if user_id is not None:
+            donors.add(user_id)
+    counters['donors_count'] = len(donors)
+    await stats_crud.set_counters(session, **counters)
+    return counters
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        counters = await reconcile_stats(session)
+        await session.commit()
+    for name, value in counters.items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,239 @@
+"""
+Бенчмарк задержки запросов во время волны входов.
+
+Запускает приложение в процессе бенчмарка на отдельной базе SQLite,
+создает пользователей и проекты, а затем замеряет задержку запросов
+GET /charity_project/ без нагрузки и во время одновременных
+POST /auth/jwt/login. Прогон повторяется для каждого размера пула
+хеширования паролей (--workers, 0 - хеширование в цикле событий) и
+сохраняет результаты в JSON, чтобы прогоны можно было сравнивать между
+собой.
+
+Запуск из корня проекта (нужен .env, как для приложения):
+
+    python -m benchmarks.login_storm --workers 0 --workers 2 \\
+        --output login_storm.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db import Base, get_async_session
+from app.core.password import password_pool
+from app.main import app
+from app.models import CharityProject, User
+from app.models.charity_project import normalize_name
+
+
+PROJECTS_URL = '/charity_project/'
+LOGIN_URL = '/auth/jwt/login'
+PASSWORD = 'benchmark password'
+
+
+async def seed(engine, args) -> None:
+    """
+    Создает схему, пользователей с настоящим хешем пароля и проекты.
+    """
+    hashed_password = password_pool.password_helper.hash(PASSWORD)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {
+                'email': f'user{index}@example.com',
+                'hashed_password': hashed_password,
+                'is_active': True,
+                'is_superuser': False,
+                'is_verified': True,
+            }
+            for index in range(args.users)
+        ])
+        await conn.execute(insert(CharityProject), [
+            {
+                'name': f'project {index}',
+                'name_normalized': normalize_name(f'project {index}'),
+                'description': 'Benchmark project',
+                'full_amount': 1000,
+            }
+            for index in range(args.projects)
+        ])
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def summary(latencies: list[float]) -> dict:
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+    }
+
+
+async def read_projects(client, stop: asyncio.Event) -> list[float]:
+    """
+    Последовательно запрашивает список проектов, пока не выставлен stop.
+    """
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(PROJECTS_URL)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+async def login_storm(client, args) -> float:
+    """
+    Выполняет args.logins входов не более чем по args.concurrency
+    одновременно.
+
+    Returns:
+        float: Длительность волны в секундах.
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login(index: int):
+        async with semaphore:
+            response = await client.post(LOGIN_URL, data={
+                'username': f'user{index % args.users}@example.com',
+                'password': PASSWORD,
+            })
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(index) for index in range(args.logins)))
+    return time.perf_counter() - started
+
+
+async def measure_reads(client, args, load=None) -> tuple[dict, float]:
+    """
+    Замеряет задержку чтения списка проектов args.readers клиентами,
+    пока выполняется load или, без нее, args.idle_seconds секунд.
+    """
+    stop = asyncio.Event()
+    readers = [
+        asyncio.create_task(read_projects(client, stop))
+        for _ in range(args.readers)
+    ]
+    if load is None:
+        await asyncio.sleep(args.idle_seconds)
+        duration = args.idle_seconds
+    else:
+        duration = await load
+    stop.set()
+    latencies = [
+        latency
+        for reader_latencies in await asyncio.gather(*readers)
+        for latency in reader_latencies
+    ]
+    return summary(latencies), duration
+
+
+async def run(workers: int, client, args) -> dict:
+    password_pool.shutdown()
+    password_pool.workers = workers
+    password_pool.max_queue_depth = 0
+    await client.get(PROJECTS_URL)
+    idle, _ = await measure_reads(client, args)
+    storm, duration = await measure_reads(
+        client, args, login_storm(client, args)
+    )
+    return {
+        'workers': workers,
+        'logins': args.logins,
+        'concurrency': args.concurrency,
+        'logins_per_second': round(args.logins / duration, 1),
+        'max_queue_depth': password_pool.max_queue_depth,
+        'idle': idle,
+        'storm': storm,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, action='append',
+                        help='размеры пула хеширования (по умолчанию 0 и 2)')
+    parser.add_argument('--logins', type=int, default=200,
+                        help='число входов в волне')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='число одновременных входов')
+    parser.add_argument('--users', type=int, default=50,
+                        help='число пользователей')
+    parser.add_argument('--projects', type=int, default=100,
+                        help='число проектов в списке')
+    parser.add_argument('--readers', type=int, default=4,
+                        help='число клиентов, читающих список проектов')
+    parser.add_argument('--idle-seconds', type=float, default=2,
+                        help='длительность замера без нагрузки')
+    parser.add_argument('--workdir', default=tempfile.gettempdir(),
+                        help='каталог для файла SQLite')
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    args = parser.parse_args()
+    args.workers = args.workers or [0, 2]
+    return args
+
+
+async def main():
+    args = parse_args()
+    path = os.path.join(args.workdir, 'login_storm_bench.sqlite3')
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+    await seed(engine, args)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    results = []
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url='http://bench'
+        ) as client:
+            for workers in args.workers:
+                result = await run(workers, client, args)
+                print(
+                    f"workers={workers} "
+                    f"idle p99={result['idle']['p99_ms']:.2f}ms "
+                    f"storm p50={result['storm']['p50_ms']:.2f}ms "
+                    f"p99={result['storm']['p99_ms']:.2f}ms "
+                    f"logins/s={result['logins_per_second']} "
+                    f"max queue={result['max_queue_depth']}"
+                )
+                results.append(result)
+    finally:
+        password_pool.shutdown()
+        app.dependency_overrides.clear()
+        await engine.dispose()
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
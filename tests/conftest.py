@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 
 import pytest
@@ -43,6 +44,11 @@ except (NameError, ImportError) as error:
     )
 
 
+from app.core.cache import charity_project_cache
+from app.core.user import user_cache
+from app.models.charity_project import normalize_name
+
+
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 
 pytest_plugins = [
@@ -54,10 +60,11 @@ TEST_DB = BASE_DIR / 'test.db'
 SQLALCHEMY_DATABASE_URL = f'sqlite+aiosqlite:///{str(TEST_DB)}'
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={'check_same_thread': False},
+    connect_args={'check_same_thread': False, 'timeout': 30},
 )
 TestingSessionLocal = sessionmaker(
     class_=AsyncSession, autocommit=False, autoflush=False, bind=engine,
+    expire_on_commit=False,
 )
 
 
@@ -67,7 +74,13 @@ async def override_db():
 
 
 @pytest_asyncio.fixture(autouse=True)
-async def init_db():
+async def init_db(monkeypatch):
+    charity_project_cache.invalidate()
+    user_cache.invalidate()
+    # Блокировка привязывается к циклу событий, а у каждого теста он свой.
+    monkeypatch.setattr(
+        'app.services.investment.local_investment_lock', asyncio.Lock()
+    )
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -79,4 +92,12 @@ async def init_db():
 def mixer():
     mixer_engine = create_engine(f'sqlite:///{str(TEST_DB)}')
     session = sessionmaker(bind=mixer_engine)
-    return _mixer(session=session(), commit=True)
+    mixer = _mixer(session=session(), commit=True)
+
+    # mixer заполняет колонки напрямую, минуя CRUD.
+    @mixer.middleware('app.models.charity_project.CharityProject')
+    def normalize_project_name(project):
+        project.name_normalized = normalize_name(project.name)
+        return project
+
+    return mixer
@@ -1,4 +1,18 @@
+import threading
+
+import pytest
+from conftest import (TestingSessionLocal, app, engine, get_async_session,
+                      override_db)
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.password import password_pool
+from app.core.user import CachedUserDatabase, user_cache
+from app.models import User
+
 REGISTER_URL = '/auth/register'
+LOGIN_URL = '/auth/jwt/login'
+ME_URL = '/users/me'
 
 
 def test_register(test_client):
@@ -49,3 +63,105 @@ def test_register_invalid_pass(user_client):
         'Убедитесь, что в ответе на некорректный POST-запрос '
         f'к эндпоинту `{REGISTER_URL}` есть ключ `detail`.'
     )
+
+
+@pytest.fixture
+def auth_client():
+    app.dependency_overrides = {}
+    app.dependency_overrides[get_async_session] = override_db
+    with TestClient(app) as client:
+        yield client
+
+
+async def test_authenticated_user_is_cached(auth_client, monkeypatch):
+    monkeypatch.setattr(user_cache, 'ttl', 30)
+    user_data = {'email': 'dead@pool.com', 'password': 'chimichangas4life'}
+    user_id = auth_client.post(REGISTER_URL, json=user_data).json()['id']
+    token = auth_client.post(LOGIN_URL, data={
+        'username': user_data['email'], 'password': user_data['password']
+    }).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    user_selects = []
+
+    def count_select(conn, cursor, statement, *args):
+        if statement.startswith('SELECT') and 'FROM user' in statement:
+            user_selects.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_select)
+    try:
+        for _ in range(3):
+            response = auth_client.get(ME_URL, headers=headers)
+            assert response.status_code == 200
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', count_select)
+    assert len(user_selects) == 1, (
+        'Активный пользователь должен загружаться из базы данных при первом '
+        'запросе, а затем браться из кэша.'
+    )
+    assert user_cache.stats() == {'hits': 2, 'misses': 1, 'size': 1}
+    response = auth_client.patch(
+        ME_URL, headers=headers, json={'email': 'new@pool.com'}
+    )
+    assert response.json()['email'] == 'new@pool.com'
+    assert auth_client.get(ME_URL, headers=headers).json()['email'] == (
+        'new@pool.com'
+    ), 'Изменение пользователя должно сбрасывать его запись в кэше.'
+    async with TestingSessionLocal() as session:
+        user_db = CachedUserDatabase(session, User)
+        user = await user_db.get(user_id)
+        await user_db.update(user, {'is_active': False})
+    response = auth_client.get(ME_URL, headers=headers)
+    assert response.status_code == 401, (
+        'Деактивированный пользователь не должен аутентифицироваться '
+        'по записи из кэша.'
+    )
+
+
+def test_password_hashing_runs_in_pool(auth_client, monkeypatch):
+    threads = []
+    helper = password_pool.password_helper
+
+    class RecordingHelper:
+        def hash(self, password):
+            threads.append(threading.current_thread().name)
+            return helper.hash(password)
+
+        def verify_and_update(self, plain_password, hashed_password):
+            threads.append(threading.current_thread().name)
+            return helper.verify_and_update(plain_password, hashed_password)
+
+    monkeypatch.setattr(password_pool, 'password_helper', RecordingHelper())
+    user_data = {'email': 'dead@pool.com', 'password': 'chimichangas4life'}
+    auth_client.post(REGISTER_URL, json=user_data)
+    for username, password, status_code in (
+        (user_data['email'], user_data['password'], 200),
+        (user_data['email'], 'wrong password', 400),
+        ('unknown@pool.com', user_data['password'], 400),
+    ):
+        response = auth_client.post(LOGIN_URL, data={
+            'username': username, 'password': password
+        })
+        assert response.status_code == status_code, (
+            f'POST-запрос к эндпоинту `{LOGIN_URL}` должен вернуть ответ '
+            f'со статусом {status_code}.'
+        )
+    token = auth_client.post(LOGIN_URL, data={
+        'username': user_data['email'], 'password': user_data['password']
+    }).json()['access_token']
+    auth_client.patch(
+        ME_URL,
+        headers={'Authorization': f'Bearer {token}'},
+        json={'password': 'new password'}
+    )
+    response = auth_client.post(LOGIN_URL, data={
+        'username': user_data['email'], 'password': 'new password'
+    })
+    assert response.status_code == 200, (
+        'После смены пароля вход должен выполняться с новым паролем.'
+    )
+    assert len(threads) == 7 and all(
+        name.startswith('password') for name in threads
+    ), (
+        'Хеширование и проверка паролей должны выполняться в пуле потоков '
+        'app.core.password, а не в цикле событий.'
+    )
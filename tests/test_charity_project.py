@@ -1,10 +1,21 @@
+import json
 import time
 from datetime import datetime
+from types import SimpleNamespace
 
 import pytest
+from asyncpg.exceptions import UniqueViolationError
+from conftest import TestingSessionLocal, engine
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.api.validators import is_name_duplicate
+from app.core.config import settings
+from app.crud.charity_project import charity_project_crud
 
 PROJECTS_URL = '/charity_project/'
 PROJECT_DETAILS_URL = PROJECTS_URL + '{project_id}'
+EXPORT_PROJECTS_URL = PROJECTS_URL + 'export'
 
 
 @pytest.mark.parametrize(
@@ -728,3 +739,382 @@ def test_get_all_charity_project_not_auth_user(test_client):
         f'пользователя к эндпоинту `{PROJECTS_URL}` возвращается список '
         'существующих проектов.'
     )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_get_charity_projects_unpaginated_by_default(test_client, monkeypatch):
+    monkeypatch.setattr(settings, 'page_size', 1)
+    response = test_client.get(PROJECTS_URL)
+    assert len(response.json()) == 2, (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` без параметров `limit` и '
+        '`cursor` должен, как и раньше, возвращать весь список проектов.'
+    )
+    assert 'X-Next-Cursor' not in response.headers
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_get_charity_projects_paginated(test_client):
+    response = test_client.get(PROJECTS_URL, params={'limit': 1})
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` с параметром `limit` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert [project['id'] for project in response.json()] == [1], (
+        'Страница должна содержать не больше `limit` проектов в порядке '
+        'создания.'
+    )
+    cursor = response.headers.get('X-Next-Cursor')
+    assert cursor, (
+        'Если есть следующая страница, ответ должен содержать заголовок '
+        '`X-Next-Cursor`.'
+    )
+    response = test_client.get(
+        PROJECTS_URL, params={'limit': 1, 'cursor': cursor}
+    )
+    assert [project['id'] for project in response.json()] == [2], (
+        'Запрос с курсором должен вернуть проекты, следующие за предыдущей '
+        'страницей.'
+    )
+    assert 'X-Next-Cursor' not in response.headers, (
+        'Ответ с последней страницей не должен содержать заголовок '
+        '`X-Next-Cursor`.'
+    )
+
+
+@pytest.mark.parametrize('params', [
+    {'limit': 0},
+    {'cursor': 'not-a-cursor'},
+])
+def test_get_charity_projects_invalid_pagination(test_client, params):
+    response = test_client.get(PROJECTS_URL, params=params)
+    assert response.status_code in (400, 422), (
+        'Некорректные параметры постраничной выдачи должны возвращать '
+        'ошибку.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_export_charity_projects(superuser_client):
+    response = superuser_client.get(EXPORT_PROJECTS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{EXPORT_PROJECTS_URL}` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == superuser_client.get(PROJECTS_URL).json(), (
+        'Выгрузка должна содержать те же проекты, что и список '
+        f'`{PROJECTS_URL}`, по одному на строку.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_get_charity_projects_sparse_fields(test_client):
+    response = test_client.get(
+        PROJECTS_URL,
+        params={'fields': 'id,name,full_amount', 'limit': 1}
+    )
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` с параметром `fields` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json() == [
+        {'id': 1, 'name': 'chimichangas4life', 'full_amount': 1000000}
+    ], 'Ответ должен содержать только поля, перечисленные в `fields`.'
+    assert 'X-Next-Cursor' in response.headers, (
+        'Параметр `fields` не должен отключать постраничную выдачу.'
+    )
+
+
+def test_get_charity_projects_unknown_fields(test_client):
+    response = test_client.get(PROJECTS_URL, params={'fields': 'id,secret'})
+    assert response.status_code == 400, (
+        'Запрос полей, которых нет в схеме ответа, должен возвращать ответ '
+        'со статус-кодом 400.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+@pytest.mark.parametrize('params, expected_ids', [
+    ({'full_amount_min': 2000000}, [2]),
+    ({'full_amount_max': 2000000}, [1]),
+    ({'fully_invested': True}, []),
+    ({'create_date_from': '2010-10-11T00:00:00'}, []),
+    ({'create_date_to': '2010-10-10T00:00:00'}, [1, 2]),
+    ({'sort': '-full_amount'}, [2, 1]),
+])
+def test_get_charity_projects_filtered(test_client, params, expected_ids):
+    response = test_client.get(PROJECTS_URL, params=params)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` с фильтрами должен '
+        'вернуть ответ со статус-кодом 200.'
+    )
+    assert [project['id'] for project in response.json()] == expected_ids, (
+        'Список проектов должен быть отфильтрован и отсортирован согласно '
+        'параметрам запроса.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_get_charity_projects_sorted_paginated(test_client):
+    response = test_client.get(
+        PROJECTS_URL, params={'sort': '-full_amount', 'limit': 1}
+    )
+    cursor = response.headers['X-Next-Cursor']
+    response = test_client.get(
+        PROJECTS_URL,
+        params={'sort': '-full_amount', 'limit': 1, 'cursor': cursor}
+    )
+    assert [project['id'] for project in response.json()] == [1], (
+        'Курсор должен продолжать выдачу в порядке выбранной сортировки.'
+    )
+    response = test_client.get(PROJECTS_URL, params={'cursor': cursor})
+    assert response.status_code == 400, (
+        'Курсор, выданный для другой сортировки, должен возвращать ответ '
+        'со статус-кодом 400.'
+    )
+
+
+def test_get_charity_projects_invalid_sort(test_client):
+    response = test_client.get(PROJECTS_URL, params={'sort': 'description'})
+    assert response.status_code == 400, (
+        'Сортировка по неразрешенному полю должна возвращать ответ со '
+        'статус-кодом 400.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_get_charity_projects_etag(superuser_client):
+    response = superuser_client.get(PROJECTS_URL)
+    etag = response.headers.get('ETag')
+    assert etag, (
+        f'Ответ на GET-запрос к эндпоинту `{PROJECTS_URL}` должен содержать '
+        'заголовок `ETag`.'
+    )
+    response = superuser_client.get(
+        PROJECTS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304, (
+        'GET-запрос с актуальным `If-None-Match` должен вернуть ответ со '
+        'статус-кодом 304.'
+    )
+    superuser_client.post(PROJECTS_URL, json={
+        'name': 'Мертвый Бассейн',
+        'description': 'Deadpool inside',
+        'full_amount': 1000000,
+    })
+    response = superuser_client.get(
+        PROJECTS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200, (
+        'После создания проекта кэш списка проектов должен сбрасываться.'
+    )
+    assert len(response.json()) == 2, (
+        'После создания проекта список должен содержать новый проект.'
+    )
+    assert response.headers['ETag'] != etag, (
+        'После изменения списка проектов его `ETag` должен измениться.'
+    )
+
+
+@pytest.mark.parametrize('name', [
+    'CHIMICHANGAS4LIFE',
+    '  chimichangas4life ',
+])
+def test_create_charity_project_normalized_same_name(
+    superuser_client, charity_project, name
+):
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': name, 'description': 'Desc', 'full_amount': 100,
+    })
+    assert response.status_code == 400, (
+        f'POST-запрос суперпользователя к эндпоинту `{PROJECTS_URL}` с '
+        'названием существующего проекта в другом регистре или с пробелами '
+        'по краям должен вернуть статус-код 400.'
+    )
+    assert response.json() == {
+        'detail': 'Проект с таким именем уже существует!'
+    }
+
+
+@pytest.mark.parametrize('name, same_name', [
+    ('Dead Pool', 'DEAD POOL'),
+    ('Мертвый Бассейн', 'МЕРТВЫЙ БАССЕЙН'),
+    ('Ёжик в тумане', ' ЁЖИК В ТУМАНЕ'),
+])
+def test_create_charity_project_normalized_same_name_unicode(
+    superuser_client, name, same_name
+):
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': name, 'description': 'Desc', 'full_amount': 100,
+    })
+    assert response.status_code == 200
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': same_name, 'description': 'Desc', 'full_amount': 100,
+    })
+    assert response.status_code == 400, (
+        f'POST-запрос суперпользователя к эндпоинту `{PROJECTS_URL}` с '
+        'названием существующего проекта в другом регистре должен вернуть '
+        'статус-код 400 и для кириллических названий.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project_nunchaku')
+def test_update_charity_project_normalized_same_name(
+    superuser_client, charity_project
+):
+    url = PROJECT_DETAILS_URL.format(project_id=charity_project.id)
+    response = superuser_client.patch(url, json={'name': ' Nunchaku'})
+    assert response.status_code == 400, (
+        f'PATCH-запрос суперпользователя к эндпоинту `{PROJECT_DETAILS_URL}`, '
+        'присваивающий проекту название другого проекта в другом регистре, '
+        'должен вернуть статус-код 400.'
+    )
+    response = superuser_client.patch(url, json={'name': 'ChimiChangas4Life'})
+    assert response.status_code == 200, (
+        'Проекту можно изменить регистр его собственного названия.'
+    )
+
+
+def asyncpg_error(constraint):
+    orig = Exception('charityproject.name')
+    orig.__cause__ = UniqueViolationError.new({
+        'C': '23505', 'M': 'duplicate key value', 'n': constraint
+    })
+    return IntegrityError('INSERT', {}, orig)
+
+
+def psycopg_error(constraint):
+    orig = Exception('charityproject.name')
+    orig.diag = SimpleNamespace(constraint_name=constraint)
+    return IntegrityError('INSERT', {}, orig)
+
+
+@pytest.mark.parametrize('make_error', [asyncpg_error, psycopg_error])
+@pytest.mark.parametrize('constraint, expected', [
+    ('ix_charityproject_name_normalized', True),
+    ('charityproject_name_key', True),
+    ('donation_user_id_fkey', False),
+])
+def test_name_duplicate_detected_by_constraint_name(
+    make_error, constraint, expected
+):
+    assert is_name_duplicate(make_error(constraint)) is expected, (
+        'В PostgreSQL нарушение уникальности названия проекта должно '
+        'определяться по имени ограничения, а не по тексту ошибки.'
+    )
+
+
+def test_search_charity_projects(superuser_client):
+    search_url = PROJECTS_URL + 'search'
+    for name, description in (
+        ('Water well', 'Clean water for the village'),
+        ('School books', 'Books for children'),
+        ('Water pump', 'Water, water and more water'),
+    ):
+        superuser_client.post(PROJECTS_URL, json={
+            'name': name, 'description': description, 'full_amount': 100
+        })
+    response = superuser_client.get(search_url, params={'q': 'water'})
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{search_url}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert [project['id'] for project in response.json()] == [3, 1], (
+        'Результаты поиска должны содержать только подходящие проекты '
+        'в порядке релевантности.'
+    )
+    first_page = superuser_client.get(
+        search_url, params={'q': 'WATER', 'limit': 1}
+    )
+    second_page = superuser_client.get(search_url, params={
+        'q': 'WATER', 'limit': 1,
+        'cursor': first_page.headers['X-Next-Cursor'],
+    })
+    assert [
+        project['id']
+        for project in first_page.json() + second_page.json()
+    ] == [3, 1], (
+        'Постраничная выдача результатов поиска должна продолжаться '
+        'с места, указанного курсором.'
+    )
+    assert 'X-Next-Cursor' not in second_page.headers
+    superuser_client.patch(PROJECTS_URL + '1', json={
+        'name': 'Well', 'description': 'Deep well'
+    })
+    superuser_client.delete(PROJECTS_URL + '3')
+    response = superuser_client.get(search_url, params={'q': 'water'})
+    assert response.json() == [], (
+        'Поисковый индекс должен обновляться при изменении и удалении '
+        'проектов.'
+    )
+    response = superuser_client.get(search_url, params={'q': 'deep books'})
+    assert response.json() == [], (
+        'Проект должен находиться, только если в нем есть все слова запроса.'
+    )
+    response = superuser_client.get(search_url, params={'q': 'well'})
+    assert [project['id'] for project in response.json()] == [1]
+
+
+def test_search_charity_projects_without_words(test_client):
+    response = test_client.get(PROJECTS_URL + 'search', params={'q': '"*'})
+    assert response.status_code == 200, (
+        'Поисковый запрос без слов не должен приводить к ошибке.'
+    )
+    assert response.json() == []
+
+
+def test_update_charity_project_loads_project_once(
+    superuser_client, charity_project
+):
+    selects = []
+
+    def count_select(conn, cursor, statement, *args):
+        if statement.startswith('SELECT') and 'FROM charityproject' in (
+            statement
+        ):
+            selects.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_select)
+    try:
+        response = superuser_client.patch(
+            PROJECT_DETAILS_URL.format(project_id=charity_project.id),
+            json={'name': 'New name', 'description': 'New description'}
+        )
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', count_select)
+    assert response.status_code == 200
+    assert len(selects) == 1, (
+        'PATCH-запрос к проекту должен загружать проект из базы данных '
+        'один раз: валидаторы и CRUD получают его из identity map сессии.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project_nunchaku')
+async def test_get_many_uses_identity_map(charity_project):
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with TestingSessionLocal() as session:
+        project = await charity_project_crud.get(charity_project.id, session)
+        event.listen(
+            engine.sync_engine, 'before_cursor_execute', count_statement
+        )
+        try:
+            projects = await charity_project_crud.get_many(
+                [charity_project.id, 2, 3, 2], session
+            )
+        finally:
+            event.remove(
+                engine.sync_engine, 'before_cursor_execute', count_statement
+            )
+    assert projects[charity_project.id] is project, (
+        'Уже загруженный в сессию объект должен браться из identity map.'
+    )
+    assert set(projects) == {charity_project.id, 2}, (
+        'get_many должен возвращать только найденные объекты.'
+    )
+    assert len(statements) == 1, (
+        'Недостающие объекты должны загружаться одним запросом с IN.'
+    )
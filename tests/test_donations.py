@@ -1,11 +1,17 @@
+import json
 import time
 from datetime import datetime
 
 import pytest
+from conftest import engine
+from sqlalchemy import event
+
+from app.core.config import settings
 
 DONATIONS_URL = '/donation/'
 DONATON_DETAILS_URL = DONATIONS_URL + '{donation_id}'
 MY_DONATIONS_URL = DONATIONS_URL + 'my'
+EXPORT_DONATIONS_URL = DONATIONS_URL + 'export'
 
 
 @pytest.mark.parametrize('json_data, expected_keys, expected_data', [
@@ -221,3 +227,154 @@ def test_create_donation_check_create_date(user_client):
         'Убедитесь, что при неодновременном создании двух пожертвований '
         'у них отличаются значения в поле `create_date`.'
     )
+
+
+def test_create_donations_bulk(user_client, charity_project):
+    response = user_client.post(
+        DONATIONS_URL + 'bulk',
+        json=[{'full_amount': 600000}, {'full_amount': 600000, 'comment': 'x'}]
+    )
+    assert response.status_code == 200, (
+        'Корректный POST-запрос зарегистрированного пользователя к эндпоинту '
+        f'`{DONATIONS_URL}bulk` должен возвращать ответ со статус-кодом 200.'
+    )
+    assert response.json() == [
+        {'id': 1, 'full_amount': 600000, 'invested_amount': 600000,
+         'fully_invested': True},
+        {'id': 2, 'full_amount': 600000, 'invested_amount': 400000,
+         'fully_invested': False},
+    ], (
+        'В ответе на создание пачки пожертвований для каждого пожертвования '
+        'должен возвращаться итог распределения по проектам.'
+    )
+    assert charity_project.fully_invested
+
+
+@pytest.mark.parametrize('json_data', [
+    [],
+    [{'full_amount': 10}, {'full_amount': -1}],
+    [{'full_amount': 10, 'invested_amount': 10}],
+])
+def test_create_donations_bulk_invalid(user_client, json_data):
+    response = user_client.post(DONATIONS_URL + 'bulk', json=json_data)
+    assert response.status_code == 422, (
+        'При некорректном теле POST-запроса к эндпоинту '
+        f'`{DONATIONS_URL}bulk` должен вернуться статус-код 422.'
+    )
+
+
+def test_export_donations(superuser_client, donation, another_donation):
+    response = superuser_client.get(EXPORT_DONATIONS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{EXPORT_DONATIONS_URL}` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.headers['content-type'] == 'application/x-ndjson', (
+        'Выгрузка пожертвований должна отдаваться в формате NDJSON.'
+    )
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == superuser_client.get(DONATIONS_URL).json(), (
+        'Выгрузка должна содержать те же пожертвования, что и список '
+        f'`{DONATIONS_URL}`, по одному на строку.'
+    )
+
+
+def test_export_donations_usual_user(user_client):
+    response = user_client.get(EXPORT_DONATIONS_URL)
+    assert response.status_code == 403, (
+        f'GET-запрос пользователя к эндпоинту `{EXPORT_DONATIONS_URL}` '
+        'должен вернуть ответ со статус-кодом 403.'
+    )
+
+
+def test_get_all_donations_filtered_by_user(
+    superuser_client, donation, another_donation
+):
+    response = superuser_client.get(DONATIONS_URL, params={'user_id': 2})
+    assert [item['id'] for item in response.json()] == [donation.id], (
+        f'Фильтр `user_id` эндпоинта `{DONATIONS_URL}` должен возвращать '
+        'только пожертвования указанного пользователя.'
+    )
+
+
+@pytest.mark.skipif(
+    settings.investment_engine == 'sql',
+    reason='SQL-движок перечитывает созданное пожертвование.'
+)
+@pytest.mark.usefixtures('charity_project')
+def test_create_donation_round_trips(user_client):
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        response = user_client.post(DONATIONS_URL, json={'full_amount': 100})
+    finally:
+        event.remove(
+            engine.sync_engine, 'before_cursor_execute', count_statement
+        )
+    assert response.status_code == 200, (
+        f'POST-запрос к эндпоинту `{DONATIONS_URL}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert len(statements) <= 9, (
+        'Создание пожертвования должно выполняться без повторного чтения '
+        'созданного объекта: INSERT ... RETURNING, обновление итогов '
+        'пользователя и статистики, выборка открытых проектов и запись '
+        'результата распределения.'
+    )
+
+
+def test_get_user_donations_summary(user_client, charity_project):
+    summary_url = MY_DONATIONS_URL + '/summary'
+    response = user_client.get(summary_url)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{summary_url}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert response.json() == {
+        'donations_count': 0, 'full_amount': 0, 'invested_amount': 0
+    }, (
+        'Для пользователя без пожертвований итоги должны быть нулевыми.'
+    )
+    user_client.post(
+        DONATIONS_URL + 'bulk',
+        json=[{'full_amount': 600000}, {'full_amount': 600000}]
+    )
+    user_client.post(DONATIONS_URL, json={'full_amount': 100})
+    response = user_client.get(summary_url)
+    assert response.json() == {
+        'donations_count': 3, 'full_amount': 1200100,
+        'invested_amount': 1000000,
+    }, (
+        f'Эндпоинт `{summary_url}` должен возвращать число пожертвований '
+        'пользователя, их общую сумму и сумму, распределенную по проектам.'
+    )
+
+
+def test_get_user_donations_pages_only_own(user_client, mixer):
+    for index in range(6):
+        mixer.blend(
+            'app.models.donation.Donation',
+            user_id=index % 2 + 1,
+            full_amount=index + 1,
+            create_date=datetime(2020, 1, index + 1),
+        )
+    amounts = []
+    pages = 0
+    params = {'limit': 2}
+    while True:
+        response = user_client.get(MY_DONATIONS_URL, params=params)
+        assert response.status_code == 200
+        amounts.extend(donation['full_amount'] for donation in response.json())
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+        params = {'limit': 2, 'cursor': cursor}
+    assert sorted(amounts) == [2, 4, 6] and pages == 2, (
+        f'Постраничная выдача эндпоинта `{MY_DONATIONS_URL}` должна '
+        'содержать только пожертвования текущего пользователя.'
+    )
@@ -1,4 +1,23 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
 import pytest
+from conftest import (
+    TestingSessionLocal, app, current_superuser, current_user,
+    get_async_session, override_db
+)
+from fixtures.user import superuser
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.crud.charity_project import charity_project_crud
+from app.models import CharityProject, Donation, Investment, User
+from app.services.investment import investment
+from app.schemas.charity_project import CharityProjectCreate
+from app.services.investment_scheduler import (InvestmentScheduler,
+                                               commit_and_wait)
 
 DONATION_URL = '/donation/'
 PROJECTS_URL = '/charity_project/'
@@ -60,3 +79,408 @@ def test_donation_to_little_invest_project(
     )
     assert not charity_project_nunchaku.fully_invested, common_asser_msg
     assert charity_project_nunchaku.invested_amount == 0, common_asser_msg
+
+
+def test_donation_split_between_projects(user_client, charity_project,
+                                         charity_project_nunchaku):
+    common_asser_msg = (
+        'При тестировании создано два пустых проекта. Затем тест создает '
+        'пожертвование, которое закрывает первый проект, а остаток должен '
+        'попасть во второй проект.'
+    )
+    response = user_client.post(DONATION_URL, json={'full_amount': 1500000})
+    assert response.status_code == 200, common_asser_msg
+    assert charity_project.fully_invested, common_asser_msg
+    assert charity_project.invested_amount == 1000000, common_asser_msg
+    assert not charity_project_nunchaku.fully_invested, common_asser_msg
+    assert charity_project_nunchaku.invested_amount == 500000, (
+        common_asser_msg
+    )
+
+
+def random_rows(rng, count):
+    rows = []
+    for index in range(count):
+        full_amount = rng.randint(1, 100)
+        rows.append({
+            'full_amount': full_amount,
+            'invested_amount': rng.choice([0, rng.randint(0, full_amount - 1)]),
+            'create_date': datetime(2020, 1, 1) + timedelta(
+                minutes=rng.randint(0, count // 2)
+            ),
+        })
+    return rows
+
+
+async def run_engine(engine, projects, donations, monkeypatch):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    async with TestingSessionLocal() as session:
+        await session.execute(delete(Investment))
+        await session.execute(delete(CharityProject))
+        await session.execute(delete(Donation))
+        session.add_all(
+            CharityProject(name=str(index), description='-', **row)
+            for index, row in enumerate(projects)
+        )
+        session.add_all(Donation(user_id=1, **row) for row in donations)
+        await session.commit()
+        await investment(session)
+        result = {}
+        for model in (CharityProject, Donation):
+            objs = await session.scalars(select(model).order_by(model.id))
+            result[model.__name__] = [
+                (obj.id, obj.invested_amount, obj.fully_invested,
+                 obj.close_date is not None)
+                for obj in objs
+            ]
+        investments = await session.scalars(
+            select(Investment).order_by(Investment.id)
+        )
+        result['Investment'] = [
+            (investment.donation_id, investment.project_id, investment.amount)
+            for investment in investments
+        ]
+        return result
+
+
+@pytest.mark.parametrize('engine', ['rows', 'sql'])
+@pytest.mark.parametrize('seed', range(10))
+async def test_engine_matches_orm_engine(monkeypatch, engine, seed):
+    rng = random.Random(seed)
+    projects = random_rows(rng, rng.randint(0, 20))
+    donations = random_rows(rng, rng.randint(0, 20))
+    orm_result = await run_engine('orm', projects, donations, monkeypatch)
+    result = await run_engine(engine, projects, donations, monkeypatch)
+    assert result == orm_result, (
+        f'Распределение инвестиций движком `{engine}` должно совпадать с '
+        'распределением циклом по ORM-объектам.'
+    )
+
+
+async def add_objects(*objs):
+    async with TestingSessionLocal() as session:
+        session.add_all(objs)
+        await session.commit()
+
+
+async def get_project(project_id):
+    async with TestingSessionLocal() as session:
+        return await session.get(CharityProject, project_id)
+
+
+async def test_scheduler_coalesces_requests():
+    scheduler = InvestmentScheduler(
+        TestingSessionLocal, window=0.01, max_batch_size=100
+    )
+    scheduler.start()
+    await add_objects(
+        CharityProject(name='project', description='-', full_amount=1000),
+        *(Donation(user_id=1, full_amount=250) for _ in range(4))
+    )
+    for _ in range(4):
+        scheduler.request()
+    await scheduler.next_pass()
+    await scheduler.stop()
+    assert not scheduler.running
+    project = await get_project(1)
+    assert project.fully_invested, (
+        'После прохода планировщика пожертвования должны быть распределены '
+        'по открытым проектам.'
+    )
+
+
+async def test_scheduler_runs_pending_pass_on_stop():
+    scheduler = InvestmentScheduler(
+        TestingSessionLocal, window=60, max_batch_size=100
+    )
+    scheduler.start()
+    await add_objects(
+        CharityProject(name='project', description='-', full_amount=1000),
+        Donation(user_id=1, full_amount=100)
+    )
+    scheduler.request()
+    await scheduler.stop()
+    project = await get_project(1)
+    assert project.invested_amount == 100, (
+        'При остановке планировщик должен выполнить накопившийся проход.'
+    )
+
+
+async def test_scheduler_retries_failed_pass(monkeypatch):
+    calls = []
+
+    async def flaky_investment(session, target=None):
+        calls.append(target)
+        if len(calls) == 1:
+            raise RuntimeError('investment failed')
+        await investment(session, target)
+
+    monkeypatch.setattr(
+        'app.services.investment_scheduler.investment', flaky_investment
+    )
+    monkeypatch.setattr(
+        'app.services.investment_scheduler.RETRY_DELAY_MIN', 0.01
+    )
+    scheduler = InvestmentScheduler(
+        TestingSessionLocal, window=0.01, max_batch_size=100
+    )
+    scheduler.start()
+    await add_objects(
+        CharityProject(name='project', description='-', full_amount=1000),
+        Donation(user_id=1, full_amount=100)
+    )
+    scheduler.request()
+    with pytest.raises(RuntimeError):
+        await scheduler.next_pass()
+    await asyncio.wait_for(scheduler.next_pass(), 5)
+    await scheduler.stop()
+    project = await get_project(1)
+    assert len(calls) == 2 and project.invested_amount == 100, (
+        'Неудавшийся проход планировщика должен повторяться без новых '
+        'запросов.'
+    )
+
+
+async def test_scheduled_investment_requested_after_commit(monkeypatch):
+    scheduler = InvestmentScheduler(
+        TestingSessionLocal, window=0.01, max_batch_size=100
+    )
+    monkeypatch.setattr(
+        'app.services.investment_scheduler.investment_scheduler', scheduler
+    )
+    scheduler.start()
+    await add_objects(Donation(user_id=1, full_amount=100))
+    project_in = CharityProjectCreate(
+        name='project', description='-', full_amount=1000
+    )
+    async with TestingSessionLocal() as session:
+        await charity_project_crud.create(project_in, session)
+        await session.rollback()
+    async with TestingSessionLocal() as session:
+        projects_count = await session.scalar(
+            select(func.count()).select_from(CharityProject)
+        )
+    assert projects_count == 0, (
+        'Запрос распределения у планировщика не должен фиксировать '
+        'транзакцию вызывающего кода.'
+    )
+    async with TestingSessionLocal() as session:
+        project = await charity_project_crud.create(project_in, session)
+        await commit_and_wait(session)
+    await scheduler.stop()
+    assert project.invested_amount == 100, (
+        'После коммита и прохода планировщика проект должен быть '
+        'перечитан с распределенными суммами.'
+    )
+
+
+async def test_scheduled_bulk_donations_report_allocation(monkeypatch):
+    scheduler = InvestmentScheduler(
+        TestingSessionLocal, window=0.01, max_batch_size=100
+    )
+    monkeypatch.setattr(
+        'app.services.investment_scheduler.investment_scheduler', scheduler
+    )
+    scheduler.start()
+    await add_objects(
+        CharityProject(name='project', description='-', full_amount=1000)
+    )
+    app.dependency_overrides = {
+        get_async_session: override_db,
+        current_user: lambda: User(id=2, is_active=True, is_superuser=False),
+    }
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        response = await client.post(
+            DONATION_URL + 'bulk',
+            json=[{'full_amount': 600}, {'full_amount': 600}]
+        )
+    app.dependency_overrides = {}
+    await scheduler.stop()
+    assert response.status_code == 200
+    assert [
+        (donation['invested_amount'], donation['fully_invested'])
+        for donation in response.json()
+    ] == [(600, True), (400, False)], (
+        'С фоновым планировщиком ответ на создание пачки пожертвований '
+        'должен содержать итог распределения после прохода.'
+    )
+
+
+async def test_concurrent_donations_conserve_totals():
+    app.dependency_overrides = {
+        get_async_session: override_db,
+        current_user: lambda: User(id=2, is_active=True, is_superuser=False),
+    }
+    await add_objects(*(
+        CharityProject(name=str(index), description='-', full_amount=1000)
+        for index in range(20)
+    ))
+    rng = random.Random(0)
+    amounts = [rng.randint(1, 200) for _ in range(200)]
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        responses = await asyncio.gather(*(
+            client.post(DONATION_URL, json={'full_amount': amount})
+            for amount in amounts
+        ))
+    app.dependency_overrides = {}
+    assert all(response.status_code == 200 for response in responses)
+    async with TestingSessionLocal() as session:
+        invested = {}
+        for model in (CharityProject, Donation):
+            invested[model] = await session.scalar(
+                select(func.sum(model.invested_amount))
+            )
+            overinvested = await session.scalar(
+                select(func.count()).where(
+                    model.invested_amount > model.full_amount
+                )
+            )
+            assert overinvested == 0
+    common_asser_msg = (
+        'При одновременном создании пожертвований суммы, вложенные в '
+        'проекты и распределенные из пожертвований, должны совпадать.'
+    )
+    assert invested[CharityProject] == invested[Donation], common_asser_msg
+    assert invested[Donation] == min(20000, sum(amounts)), common_asser_msg
+
+
+async def test_concurrent_projects_and_donations_conserve_totals():
+    app.dependency_overrides = {
+        get_async_session: override_db,
+        current_user: lambda: superuser,
+        current_superuser: lambda: superuser,
+    }
+    # Пожертвования крупнее проектов, поэтому конкурирующий проход
+    # пожертвования часто заполняет только что созданный проект.
+    rng = random.Random(0)
+    requests = [
+        (PROJECTS_URL, {
+            'name': f'project {index}',
+            'description': '-',
+            'full_amount': rng.randint(10, 200),
+        })
+        for index in range(60)
+    ] + [
+        (DONATION_URL, {'full_amount': rng.randint(50, 500)})
+        for _ in range(60)
+    ]
+    rng.shuffle(requests)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        responses = await asyncio.gather(*(
+            client.post(url, json=json) for url, json in requests
+        ))
+    app.dependency_overrides = {}
+    assert all(response.status_code in (200, 201) for response in responses)
+    totals = {PROJECTS_URL: 0, DONATION_URL: 0}
+    for url, json in requests:
+        totals[url] += json['full_amount']
+    async with TestingSessionLocal() as session:
+        invested = {}
+        open_count = {}
+        for model in (CharityProject, Donation):
+            invested[model] = await session.scalar(
+                select(func.sum(model.invested_amount))
+            )
+            open_count[model] = await session.scalar(
+                select(func.count()).where(model.fully_invested.is_(False))
+            )
+        ledger_total = await session.scalar(select(func.sum(Investment.amount)))
+    common_asser_msg = (
+        'При одновременном создании проектов и пожертвований суммы, '
+        'вложенные в проекты, распределенные из пожертвований и записанные '
+        'в журнал, должны совпадать.'
+    )
+    assert invested[CharityProject] == invested[Donation] == ledger_total, (
+        common_asser_msg
+    )
+    assert invested[Donation] == min(totals.values()), common_asser_msg
+    assert not (open_count[CharityProject] and open_count[Donation]), (
+        'После одновременного создания проектов и пожертвований не должно '
+        'оставаться одновременно открытых проектов и открытых пожертвований.'
+    )
+
+
+def test_investment_ledger(superuser_client, charity_project,
+                           charity_project_nunchaku):
+    app.dependency_overrides[current_user] = lambda: superuser
+    superuser_client.post(DONATION_URL, json={'full_amount': 1500000})
+    superuser_client.post(DONATION_URL, json={'full_amount': 100})
+    response = superuser_client.get(f'{PROJECTS_URL}2/donations')
+    assert response.status_code == 200, (
+        'GET-запрос суперпользователя к эндпоинту '
+        f'`{PROJECTS_URL}{{project_id}}/donations` должен вернуть ответ со '
+        'статус-кодом 200.'
+    )
+    assert [
+        (row['donation_id'], row['amount']) for row in response.json()
+    ] == [(1, 500000), (2, 100)], (
+        'Журнал распределения проекта должен содержать все вложенные в него '
+        'пожертвования.'
+    )
+    response = superuser_client.get(f'{DONATION_URL}1/projects')
+    assert [
+        (row['project_id'], row['amount']) for row in response.json()
+    ] == [(1, 1000000), (2, 500000)], (
+        'Журнал распределения пожертвования должен содержать все проекты, '
+        'в которые оно вложено.'
+    )
+
+
+@pytest.mark.parametrize('url', [
+    f'{PROJECTS_URL}1/donations',
+    f'{DONATION_URL}1/projects',
+])
+def test_investment_ledger_not_found(superuser_client, url):
+    response = superuser_client.get(url)
+    assert response.status_code == 404, (
+        f'GET-запрос к эндпоинту `{url}` для несуществующего объекта должен '
+        'вернуть ответ со статус-кодом 404.'
+    )
+
+
+def test_donation_rolled_back_when_investment_fails(
+    user_client, charity_project, monkeypatch
+):
+    async def broken_investment(*args, **kwargs):
+        raise RuntimeError('investment failed')
+
+    monkeypatch.setattr(
+        'app.services.investment_scheduler.investment', broken_investment
+    )
+    with pytest.raises(RuntimeError):
+        user_client.post(DONATION_URL, json={'full_amount': 100})
+    monkeypatch.undo()
+    assert user_client.get(DONATION_URL + 'my').json() == [], (
+        'Если распределение инвестиций завершилось ошибкой, пожертвование '
+        'не должно сохраняться.'
+    )
+
+
+def test_project_full_amount_change_reinvests(
+    superuser_client, charity_project, donation, another_donation
+):
+    project = superuser_client.patch(
+        PROJECTS_URL + str(charity_project.id),
+        json={'full_amount': 1000050}
+    ).json()
+    assert project['invested_amount'] == 2100, (
+        'При изменении требуемой суммы открытого проекта в него должны '
+        'переводиться остатки открытых пожертвований.'
+    )
+    donations = superuser_client.get(DONATION_URL).json()
+    assert [donation['fully_invested'] for donation in donations] == [
+        True, True
+    ]
+    project = superuser_client.patch(
+        PROJECTS_URL + str(charity_project.id), json={'full_amount': 2100}
+    ).json()
+    assert project['fully_invested'] is True, (
+        'Проект, требуемая сумма которого стала равна вложенной, должен '
+        'закрываться.'
+    )
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+from hypothesis import given, settings, strategies as st
+
+from app.models import CharityProject, Donation
+from app.schemas.charity_project import MAX_SIMULATED_DONATIONS
+from app.services.investment import allocate
+from app.services.simulation import forecast_projects, simulate_investment
+
+PROJECTS_URL = '/charity_project/'
+SIMULATE_URL = PROJECTS_URL + 'simulate'
+
+amounts = st.lists(st.integers(min_value=1, max_value=1000), max_size=30)
+
+
+def make_objects(model, amounts):
+    return [
+        model(id=index, full_amount=amount, invested_amount=0)
+        for index, amount in enumerate(amounts)
+    ]
+
+
+@settings(max_examples=300)
+@given(project_amounts=amounts, donation_amounts=amounts)
+def test_simulation_matches_engine(project_amounts, donation_amounts):
+    projects = make_objects(CharityProject, project_amounts)
+    donations = make_objects(Donation, donation_amounts)
+    allocations = allocate(projects, donations)
+    project_invested, donation_invested, closing_donations = (
+        simulate_investment(project_amounts, donation_amounts)
+    )
+    assert project_invested.tolist() == [
+        project.invested_amount for project in projects
+    ]
+    assert donation_invested.tolist() == [
+        donation.invested_amount for donation in donations
+    ]
+    closed_by = {}
+    for allocation in allocations:
+        closed_by[allocation['project_id']] = allocation['donation_id']
+    assert closing_donations.tolist() == [
+        closed_by[project.id] if project.fully_invested else -1
+        for project in projects
+    ]
+
+
+def test_simulate_endpoint(superuser_client, charity_project,
+                           charity_project_nunchaku):
+    response = superuser_client.post(
+        SIMULATE_URL, json={'donations': [400000, 700000, 100]}
+    )
+    assert response.status_code == 200, (
+        f'POST-запрос суперпользователя к эндпоинту `{SIMULATE_URL}` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json() == {
+        'projects': [
+            {
+                'id': 1,
+                'name': 'chimichangas4life',
+                'full_amount': 1000000,
+                'invested_amount': 1000000,
+                'fully_invested': True,
+                'closing_donation': 1,
+            },
+            {
+                'id': 2,
+                'name': 'nunchaku',
+                'full_amount': 5000000,
+                'invested_amount': 100100,
+                'fully_invested': False,
+                'closing_donation': None,
+            },
+        ],
+        'idle_amount': 0,
+    }, (
+        'Прогноз распределения отличается от ожидаемого.'
+    )
+    assert not charity_project.fully_invested, (
+        'Прогноз распределения не должен изменять данные в базе.'
+    )
+
+
+def test_simulate_endpoint_usual_user(user_client):
+    response = user_client.post(SIMULATE_URL, json={'donations': [100]})
+    assert response.status_code == 403, (
+        f'Прогноз распределения по эндпоинту `{SIMULATE_URL}` должен быть '
+        'доступен только суперпользователю.'
+    )
+
+
+def test_forecast_project_closed_by_open_donation():
+    projects = [
+        SimpleNamespace(id=1, name='first', full_amount=100,
+                        invested_amount=0),
+        SimpleNamespace(id=2, name='second', full_amount=100,
+                        invested_amount=0),
+    ]
+    forecast, idle_amount = forecast_projects(projects, [150], [50])
+    assert [project['fully_invested'] for project in forecast] == [
+        True, True
+    ]
+    assert [project['closing_donation'] for project in forecast] == [
+        None, 0
+    ], (
+        'Проект, который закроет уже открытое пожертвование, должен '
+        'получить closing_donation = None.'
+    )
+    assert idle_amount == 0
+
+
+def test_simulate_endpoint_large_batch(superuser_client, charity_project):
+    response = superuser_client.post(
+        SIMULATE_URL, json={'donations': [100] * 50000}
+    )
+    assert response.status_code == 200, (
+        f'Эндпоинт `{SIMULATE_URL}` должен прогнозировать распределение '
+        'для 50 000 ожидаемых пожертвований.'
+    )
+    assert response.json()['idle_amount'] == 4000000
+
+
+def test_simulate_endpoint_too_many_donations(superuser_client):
+    response = superuser_client.post(
+        SIMULATE_URL, json={'donations': [1] * (MAX_SIMULATED_DONATIONS + 1)}
+    )
+    assert response.status_code == 422, (
+        f'POST-запрос к эндпоинту `{SIMULATE_URL}` с числом пожертвований '
+        f'больше {MAX_SIMULATED_DONATIONS} должен вернуть ответ со '
+        'статус-кодом 422.'
+    )
@@ -0,0 +1,81 @@
+from conftest import TestingSessionLocal, app, current_user
+from fixtures.user import superuser
+
+from app.services.stats import reconcile_stats
+
+STATS_URL = '/stats/'
+PROJECTS_URL = '/charity_project/'
+DONATION_URL = '/donation/'
+
+
+def test_get_stats_empty(test_client):
+    response = test_client.get(STATS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{STATS_URL}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert response.json() == {
+        'donated_amount': 0, 'invested_amount': 0, 'open_projects': 0,
+        'closed_projects': 0, 'donors_count': 0,
+    }, (
+        'Пока проектов и пожертвований нет, статистика должна быть нулевой.'
+    )
+
+
+async def test_stats_maintained(superuser_client):
+    app.dependency_overrides[current_user] = lambda: superuser
+    for name, full_amount in (('first', 100), ('second', 1000)):
+        superuser_client.post(PROJECTS_URL, json={
+            'name': name, 'description': name, 'full_amount': full_amount
+        })
+    superuser_client.post(DONATION_URL, json={'full_amount': 150})
+    superuser_client.post(DONATION_URL + 'bulk', json=[{'full_amount': 50}])
+    project_id = superuser_client.post(PROJECTS_URL, json={
+        'name': 'third', 'description': 'third', 'full_amount': 10
+    }).json()['id']
+    superuser_client.delete(PROJECTS_URL + str(project_id))
+    superuser_client.patch(PROJECTS_URL + '2', json={'full_amount': 100})
+    expected = {
+        'donated_amount': 200, 'invested_amount': 200, 'open_projects': 0,
+        'closed_projects': 2, 'donors_count': 1,
+    }
+    assert superuser_client.get(STATS_URL).json() == expected, (
+        'Статистика должна учитывать созданные пожертвования, распределение '
+        'и создание, закрытие и удаление проектов.'
+    )
+    async with TestingSessionLocal() as session:
+        counters = await reconcile_stats(session)
+        await session.commit()
+    assert counters == expected, (
+        'Пересчет статистики по таблицам должен совпадать с поддерживаемыми '
+        'счетчиками.'
+    )
+
+
+PROCESS_STATS_KEYS = {
+    STATS_URL + 'cache': {'users'},
+    STATS_URL + 'password_pool': {
+        'workers', 'in_flight', 'queue_depth', 'max_queue_depth'
+    },
+}
+
+
+def test_get_process_stats(superuser_client):
+    for url, expected_keys in PROCESS_STATS_KEYS.items():
+        response = superuser_client.get(url)
+        assert response.status_code == 200, (
+            f'GET-запрос суперпользователя к эндпоинту `{url}` должен '
+            'вернуть ответ со статус-кодом 200.'
+        )
+        assert response.json().keys() == expected_keys, (
+            f'Ответ эндпоинта `{url}` отличается от ожидаемого.'
+        )
+
+
+def test_get_process_stats_forbidden(user_client):
+    for url in PROCESS_STATS_KEYS:
+        response = user_client.get(url)
+        assert response.status_code == 403, (
+            f'GET-запрос обычного пользователя к эндпоинту `{url}` должен '
+            'вернуть ответ со статус-кодом 403.'
+        )